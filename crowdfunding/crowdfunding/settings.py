@@ -61,6 +61,17 @@ CACHES = {
     }
 }
 
+# Channels layer used by the ingester to fan events out to the websocket consumers of
+# every worker, group messages are published once and received by each subscribed worker
+CHANNEL_LAYERS = {
+    "default": {
+        "BACKEND": "channels_redis.pubsub.RedisPubSubChannelLayer",
+        "CONFIG": {
+            "hosts": [("127.0.0.1", 6379)],
+        },
+    }
+}
+
 ROOT_URLCONF = 'crowdfunding.urls'
 
 TEMPLATES = [
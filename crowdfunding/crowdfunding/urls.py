@@ -20,4 +20,13 @@ from events import views
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('', views.index, name='index'),
+    path('api/campaigns/', views.campaigns, name='campaigns'),
+    path('api/campaigns/<int:campaignID>/', views.campaign, name='campaign'),
+    path('api/campaigns/<int:campaignID>/funders/', views.campaign_funders, name='campaign_funders'),
+    path('api/campaigns/<int:campaignID>/refunds/', views.campaign_refunds, name='campaign_refunds'),
+    path('api/funders/<str:address>/', views.funder, name='funder'),
+    path('api/stats/', views.stats, name='stats'),
+    path('api/abi/<slug:name>/', views.abi, name='abi'),
+    path('metrics/', views.metrics, name='metrics'),
+    path('metrics/profile/', views.profile, name='profile'),
 ]
@@ -0,0 +1,337 @@
+from asgiref.sync import sync_to_async
+from pathlib import Path
+from .checkpoint import REBUILD_CHECKPOINT_NAME, START_CHECKPOINT_NAME, load_checkpoint
+from .contract import deploymentBlock
+from .ledger import GWEI, MAX_WEI, to_wei
+from .persistence import event_id, get_collection
+from .projections import get_collection as get_campaigns_collection
+import json
+import logging
+import numpy as np
+import os
+import shutil
+import zlib
+
+'''
+Module compacting the finalized events into append-only columnar segments, scanned
+through memory maps for analytics and verification
+'''
+
+logger = logging.getLogger(__name__)
+
+# folder holding one sub folder per segment and the index of the segments
+ARCHIVE_DIR = Path(__file__).resolve().parent.parent / 'archive'
+INDEX_FILE = 'index.json'
+SIDE_TABLE_FILE = 'side.json.zz'
+
+# segments never span two partitions of this many blocks
+PARTITION_BLOCKS = 100000
+
+# event arguments stored in each column, the order of the events gives their code
+# on disk so new events can only be appended
+EVENT_COLUMNS = {
+    'NewCampaignCreated': {'campaign': 'campaignID', 'address': 'beneficiary', 'amount': 'amount', 'value': 'deadline'},
+    'NewContribution': {'campaign': 'campaignID', 'address': 'from', 'amount': 'amountFunded'},
+    'Refund': {'campaign': 'campaignID', 'address': 'refunded', 'amount': 'amount'},
+    'GoalReached': {'campaign': 'campaignID', 'value': 'timestamp'},
+    'OfferReceived': {'address': 'from', 'amount': 'amount'},
+    'Transfer': {'address': 'from', 'counterparty': 'to', 'amount': 'value'},
+}
+EVENT_TYPES = list(EVENT_COLUMNS)
+EVENT_CODES = {eventName: code for code, eventName in enumerate(EVENT_TYPES)}
+
+# fixed width columns, amounts are split in gwei and a remainder like in the ledger and
+# hashes are kept as raw bytes, numpy would strip the trailing zeros of a bytes string
+COLUMNS = {
+    'block': np.uint64,
+    'logIndex': np.uint32,
+    'event': np.uint8,
+    'campaign': np.uint64,
+    'gwei': np.uint64,
+    'wei': np.uint32,
+    'value': np.uint64,
+    'address': np.uint32,
+    'counterparty': np.uint32,
+    'transaction': (np.uint8, 32),
+}
+
+# values of the columns an event has no argument for
+NO_CAMPAIGN = np.iinfo(np.uint64).max
+NO_ADDRESS = np.iinfo(np.uint32).max
+
+
+def encode_segment(events, descriptions):
+    # columns and side table of events sorted by position
+    columns = {name: np.zeros(len(events), dtype=dtype) for name, dtype in COLUMNS.items()}
+    columns['campaign'][:] = NO_CAMPAIGN
+    columns['address'][:] = NO_ADDRESS
+    columns['counterparty'][:] = NO_ADDRESS
+    addresses = {}
+
+    for row, event in enumerate(events):
+        mapping = EVENT_COLUMNS[event['event']]
+        args = event['args']
+        columns['block'][row] = event['blockNumber']
+        columns['logIndex'][row] = event['logIndex']
+        columns['event'][row] = EVENT_CODES[event['event']]
+        columns['transaction'][row] = np.frombuffer(bytes.fromhex(event['transactionHash'][2:]), dtype=np.uint8)
+        if 'campaign' in mapping:
+            columns['campaign'][row] = int(args[mapping['campaign']])
+        if 'amount' in mapping:
+            amount = int(args[mapping['amount']])
+            if amount >= MAX_WEI:
+                raise OverflowError(f'Amount of {amount} wei does not fit the archive')
+            columns['gwei'][row], columns['wei'][row] = divmod(amount, GWEI)
+        if 'value' in mapping:
+            columns['value'][row] = int(args[mapping['value']])
+        for column in ('address', 'counterparty'):
+            if column in mapping:
+                columns[column][row] = addresses.setdefault(args[mapping[column]], len(addresses))
+
+    campaignIDs = {
+        int(event['args']['campaignID']) for event in events if event['event'] == 'NewCampaignCreated'
+    }
+    sideTable = {
+        'addresses': list(addresses),
+        'descriptions': {str(c): descriptions[c] for c in campaignIDs if c in descriptions},
+    }
+    return columns, sideTable
+
+
+class EventArchive:
+    '''
+    Segments of events sorted by block and log index, with a json index of their ranges
+
+    Every segment is a folder of .npy columns loaded as read only memory maps and a
+    zlib compressed side table of the addresses and campaign descriptions the
+    address columns refer to. Segments are written next to their final name and
+    renamed, then the index is replaced, so readers only ever see complete segments.
+    '''
+
+    def __init__(self, path=ARCHIVE_DIR):
+        self.path = Path(path)
+
+    def load_index(self):
+        try:
+            with open(self.path / INDEX_FILE) as indexFile:
+                return json.load(indexFile)
+        except FileNotFoundError:
+            return {'archivedBlock': None, 'segments': []}
+
+    def save_index(self, index):
+        temporary = self.path / f'{INDEX_FILE}.tmp'
+        with open(temporary, 'w') as indexFile:
+            json.dump(index, indexFile, indent=1)
+        os.replace(temporary, self.path / INDEX_FILE)
+
+    @property
+    def archivedBlock(self):
+        return self.load_index()['archivedBlock']
+
+    def write_segment(self, name, columns, sideTable):
+        final = self.path / name
+        temporary = self.path / f'.{name}.tmp'
+        for folder in (final, temporary):
+            # left over by a crash before the index was saved
+            if folder.exists():
+                shutil.rmtree(folder)
+        temporary.mkdir(parents=True)
+        for column, values in columns.items():
+            np.save(temporary / f'{column}.npy', values)
+        with open(temporary / SIDE_TABLE_FILE, 'wb') as sideFile:
+            sideFile.write(zlib.compress(json.dumps(sideTable).encode(), 9))
+        os.rename(temporary, final)
+
+    def append(self, events, toBlock, descriptions=None):
+        # events sorted by position, after the archived block and up to `toBlock` included
+        self.path.mkdir(parents=True, exist_ok=True)
+        index = self.load_index()
+        fromBlock = 0 if index['archivedBlock'] is None else index['archivedBlock'] + 1
+        if toBlock < fromBlock:
+            return 0
+
+        events = [event for event in events if event['event'] in EVENT_CODES]
+        if any(not fromBlock <= event['blockNumber'] <= toBlock for event in events):
+            raise ValueError(f'Events outside of blocks {fromBlock}-{toBlock}')
+
+        start = 0
+        while start < len(events):
+            partition = events[start]['blockNumber'] // PARTITION_BLOCKS
+            end = start
+            while end < len(events) and events[end]['blockNumber'] // PARTITION_BLOCKS == partition:
+                end += 1
+            chunk = events[start:end]
+            columns, sideTable = encode_segment(chunk, descriptions or {})
+            # runs never share blocks, so the block range names the segment
+            name = f"{chunk[0]['blockNumber']:012d}-{chunk[-1]['blockNumber']:012d}"
+            self.write_segment(name, columns, sideTable)
+            index['segments'].append({
+                'name': name,
+                'minBlock': chunk[0]['blockNumber'],
+                'maxBlock': chunk[-1]['blockNumber'],
+                'count': len(chunk),
+            })
+            start = end
+
+        index['archivedBlock'] = toBlock
+        self.save_index(index)
+        return len(events)
+
+    def segments(self, fromBlock=None, toBlock=None):
+        # segments holding blocks of the range, the others are skipped without being opened
+        return [
+            segment for segment in self.load_index()['segments']
+            if (fromBlock is None or segment['maxBlock'] >= fromBlock)
+            and (toBlock is None or segment['minBlock'] <= toBlock)
+        ]
+
+    def open_segment(self, segment, columns=None):
+        folder = self.path / segment['name']
+        return {column: np.load(folder / f'{column}.npy', mmap_mode='r') for column in columns or COLUMNS}
+
+    def side_table(self, segment):
+        with open(self.path / segment['name'] / SIDE_TABLE_FILE, 'rb') as sideFile:
+            return json.loads(zlib.decompress(sideFile.read()))
+
+    def scan(self, fromBlock=None, toBlock=None, columns=None):
+        # (segment, columns) of the range in block order, the arrays are views of the memory maps
+        columns = list(dict.fromkeys(['block', *(columns or COLUMNS)]))
+        for segment in self.segments(fromBlock, toBlock):
+            arrays = self.open_segment(segment, columns)
+            blocks = arrays['block']
+            start = 0 if fromBlock is None else np.searchsorted(blocks, fromBlock, side='left')
+            end = len(blocks) if toBlock is None else np.searchsorted(blocks, toBlock, side='right')
+            if start < end:
+                yield segment, {column: values[start:end] for column, values in arrays.items()}
+
+    def iter_events(self, fromBlock=None, toBlock=None):
+        # events rebuilt from the columns, in the format of the stored events
+        for segment, arrays in self.scan(fromBlock, toBlock):
+            addresses = self.side_table(segment)['addresses']
+            for row in range(len(arrays['block'])):
+                eventName = EVENT_TYPES[arrays['event'][row]]
+                args = {}
+                for column, argName in EVENT_COLUMNS[eventName].items():
+                    if column == 'campaign':
+                        args[argName] = int(arrays['campaign'][row])
+                    elif column == 'amount':
+                        args[argName] = to_wei(arrays['gwei'][row], arrays['wei'][row])
+                    elif column == 'value':
+                        args[argName] = int(arrays['value'][row])
+                    else:
+                        args[argName] = addresses[arrays[column][row]]
+                yield {
+                    'event': eventName,
+                    'args': args,
+                    'blockNumber': int(arrays['block'][row]),
+                    'logIndex': int(arrays['logIndex'][row]),
+                    'transactionHash': '0x' + arrays['transaction'][row].tobytes().hex(),
+                }
+
+    def positions(self, fromBlock=None, toBlock=None):
+        # (block, log index) of every archived event of the range
+        positions = set()
+        for _, arrays in self.scan(fromBlock, toBlock, ['logIndex']):
+            positions.update(zip(arrays['block'].tolist(), arrays['logIndex'].tolist()))
+        return positions
+
+    def campaign_totals(self, fromBlock=None, toBlock=None):
+        # wei contributed and refunded per campaign, summed in numpy one segment at a time
+        totals = {}
+        for _, arrays in self.scan(fromBlock, toBlock, ['event', 'campaign', 'gwei', 'wei']):
+            for eventName, key in (('NewContribution', 'raised'), ('Refund', 'refunded')):
+                selected = np.flatnonzero(arrays['event'] == EVENT_CODES[eventName])
+                if not len(selected):
+                    continue
+                # group the rows by campaign and sum each group
+                selected = selected[np.argsort(arrays['campaign'][selected], kind='stable')]
+                campaigns = arrays['campaign'][selected]
+                starts = np.flatnonzero(np.concatenate([[True], campaigns[1:] != campaigns[:-1]]))
+                gwei = np.add.reduceat(arrays['gwei'][selected], starts)
+                wei = np.add.reduceat(arrays['wei'][selected].astype(np.uint64), starts)
+                counts = np.diff(np.append(starts, len(selected)))
+                for campaignID, groupGwei, groupWei, count in zip(campaigns[starts].tolist(), gwei, wei, counts):
+                    record = totals.setdefault(campaignID, {'raised': 0, 'refunded': 0, 'contributions': 0})
+                    record[key] += to_wei(groupGwei, groupWei)
+                    if key == 'raised':
+                        record['contributions'] += int(count)
+        return totals
+
+
+def fetch_descriptions(events):
+    # descriptions of the created campaigns, read from the campaign projection
+    campaignIDs = [int(event['args']['campaignID']) for event in events if event['event'] == 'NewCampaignCreated']
+    if not campaignIDs:
+        return {}
+    documents = get_campaigns_collection().find({'_id': {'$in': campaignIDs}}, {'description': 1})
+    return {document['_id']: document['description'] for document in documents}
+
+
+def finalized_block(confirmations):
+    # last block whose events are all stored, deep enough not to be reorganized anymore
+    checkpoint = load_checkpoint()
+    newest = get_collection().find_one({}, {'blockNumber': 1}, sort=[('blockNumber', -1)])
+    if newest is None or checkpoint is None:
+        return None
+    # the persister stores the live events in block order, so the blocks before the
+    # newest stored one are complete back to the block the ingester started from
+    toBlock = min(newest['blockNumber'] - 1, checkpoint - confirmations)
+    start = load_checkpoint(START_CHECKPOINT_NAME)
+    if start is not None and deploymentBlock is not None and start <= deploymentBlock:
+        return toBlock
+
+    # backfilled ranges are stored in any order, they are complete once the backfill
+    # command rebuilt the campaign records after them
+    rebuilt = load_checkpoint(REBUILD_CHECKPOINT_NAME)
+    if rebuilt is None:
+        return None
+    return toBlock if start is not None and rebuilt >= start - 1 else min(toBlock, rebuilt)
+
+
+def partition_end(block):
+    # last block of the last partition complete at `block`, segments are never appended
+    # to so only whole partitions are archived
+    return (block + 1) // PARTITION_BLOCKS * PARTITION_BLOCKS - 1
+
+
+def find_orphans(events, fromBlock, toBlock):
+    # ids of the stored events of the range the chain does not return anymore
+    query = {'blockNumber': {'$gte': fromBlock, '$lte': toBlock}, 'event': {'$in': EVENT_TYPES}}
+    canonical = {event_id(event) for event in events}
+    return [document['_id'] for document in get_collection().find(query, {'_id': 1}) if document['_id'] not in canonical]
+
+
+def first_block():
+    oldest = get_collection().find_one({}, {'blockNumber': 1}, sort=[('blockNumber', 1)])
+    return None if oldest is None else oldest['blockNumber']
+
+
+async def archive_events(archive, backfill, toBlock, batchBlocks=PARTITION_BLOCKS):
+    # move the events up to `toBlock` into new segments, a partition at a time. The live
+    # poller stored them before they were final, so the logs are read again from the
+    # chain and the stored events of reorganized blocks are left out
+    archived = 0
+    fromBlock = archive.archivedBlock
+    fromBlock = await sync_to_async(first_block)() if fromBlock is None else fromBlock + 1
+    while fromBlock is not None and fromBlock <= toBlock:
+        endBlock = min((fromBlock // batchBlocks + 1) * batchBlocks - 1, toBlock)
+        events = []
+
+        async def collect(chunk, lastBlock):
+            events.extend(event for event in chunk if event['event'] in EVENT_CODES)
+
+        await backfill.run(fromBlock, endBlock, collect)
+        events.sort(key=lambda event: (event['blockNumber'], event['logIndex']))
+        orphans = await sync_to_async(find_orphans)(events, fromBlock, endBlock)
+        if orphans:
+            logger.warning('%d stored events of blocks %d-%d are not on the chain anymore: %s',
+                           len(orphans), fromBlock, endBlock, ', '.join(orphans[:10]))
+        descriptions = await sync_to_async(fetch_descriptions)(events)
+        archived += await sync_to_async(archive.append)(events, endBlock, descriptions)
+        logger.info('Archived blocks %d-%d', fromBlock, endBlock)
+        fromBlock = endBlock + 1
+    return archived
+
+
+# archive of this project
+archive = EventArchive()
@@ -0,0 +1,92 @@
+from collections import deque
+from .rpc import RpcError
+import asyncio
+import logging
+
+'''
+Module scanning past block ranges of the contract logs with a bounded pool of concurrent requests
+'''
+
+logger = logging.getLogger(__name__)
+
+# fragments of the errors returned by the providers when a range holds too many logs
+TOO_LARGE_ERRORS = ('more than', 'too large', 'too many', 'size exceeded', 'limit exceeded', 'block range')
+
+
+def is_too_large(error):
+    message = str(error).lower()
+    return error.code == -32005 or any(fragment in message for fragment in TOO_LARGE_ERRORS)
+
+
+async def find_deployment_block(rpc, address, head):
+    # binary search of the first block where the contract code exists
+    low, high = 0, head
+    while low < high:
+        middle = (low + high) // 2
+        code = await rpc.request('eth_getCode', [address, hex(middle)])
+        if code in ('0x', '0x0'):
+            low = middle + 1
+        else:
+            high = middle
+    return low
+
+
+class Backfill:
+    '''
+    Fetches fixed-size chunks of blocks concurrently and hands their events over in block order
+
+    Ranges rejected by the provider for holding too many logs are split in halves until
+    they fit, so the chunk size only needs to be a reasonable upper bound.
+    '''
+
+    def __init__(self, poller, chunkSize=2000, workers=4, retries=3):
+        self.poller = poller
+        self.chunkSize = chunkSize
+        self.workers = workers
+        self.retries = retries
+
+    async def fetch(self, fromBlock, toBlock, attempt=0):
+        try:
+            logs = await self.poller.get_logs(fromBlock, toBlock)
+        except RpcError as error:
+            if not is_too_large(error) or fromBlock == toBlock:
+                raise
+            middle = (fromBlock + toBlock) // 2
+            logger.info('Splitting blocks %d-%d', fromBlock, toBlock)
+            return await self.fetch(fromBlock, middle) + await self.fetch(middle + 1, toBlock)
+        except Exception:
+            if attempt >= self.retries:
+                raise
+            await asyncio.sleep(2 ** attempt)
+            return await self.fetch(fromBlock, toBlock, attempt + 1)
+
+        return [self.poller.decode(log) for log in logs if not log.get('removed')]
+
+    def chunks(self, fromBlock, toBlock):
+        for start in range(fromBlock, toBlock + 1, self.chunkSize):
+            yield start, min(start + self.chunkSize - 1, toBlock)
+
+    async def run(self, fromBlock, toBlock, store):
+        # `store` is awaited with the events of each chunk, in block order, and the chunk's last block
+        chunks = self.chunks(fromBlock, toBlock)
+        pending = deque()
+
+        def schedule():
+            chunk = next(chunks, None)
+            if chunk is not None:
+                pending.append((chunk, asyncio.ensure_future(self.fetch(*chunk))))
+
+        # keep at most `workers` requests in flight
+        for _ in range(self.workers):
+            schedule()
+
+        try:
+            while pending:
+                (start, end), task = pending.popleft()
+                events = await task
+                schedule()
+                await store(events, end)
+                logger.info('Processed blocks %d-%d: %d events', start, end, len(events))
+        finally:
+            for _, task in pending:
+                task.cancel()
@@ -0,0 +1,208 @@
+from channels.testing import WebsocketCommunicator
+from collections import Counter
+from web3 import Web3
+from .buffer import EventBuffer, RecentEvents
+from .consumer import EventsConsumer
+from .contract import contractName
+from .ingester import EVENT_NAMES, ingester
+from .poller import LogPoller
+from . import registry
+import asyncio
+import json
+import statistics
+import threading
+import time
+import tracemalloc
+
+'''
+Module benchmarking the event pipeline against an in-process test chain
+
+The CrowdFunding contract compiled by truffle is deployed on eth-tester, synthetic
+campaigns and contributions are sent at a fixed rate and simulated websocket clients
+measure when each event reaches them.
+'''
+
+
+def to_rpc(value):
+    # encode eth-tester results the way a JSON-RPC node does, with hex quantities
+    if isinstance(value, bool) or value is None or isinstance(value, str):
+        return value
+    if isinstance(value, int):
+        return hex(value)
+    if isinstance(value, bytes):
+        return Web3.toHex(value)
+    if isinstance(value, dict):
+        return {key: to_rpc(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_rpc(item) for item in value]
+    return value
+
+
+def percentile(values, fraction):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(int(len(values) * fraction), len(values) - 1)]
+
+
+class TesterRpcClient:
+    '''
+    Stand-in for the asyncio JSON-RPC client answering from eth-tester and counting the calls
+    '''
+
+    def __init__(self, web3, lock):
+        self.web3 = web3
+        self.lock = lock
+        self.calls = Counter()
+
+    def request_sync(self, method, params):
+        with self.lock:
+            return self.web3.manager.request_blocking(method, params)
+
+    async def request(self, method, params=None):
+        self.calls[method] += 1
+        loop = asyncio.get_running_loop()
+        result = await loop.run_in_executor(None, self.request_sync, method, params or [])
+        return to_rpc(result)
+
+    async def close(self):
+        pass
+
+
+class Benchmark:
+    '''
+    Runs one load test and returns its measures
+    '''
+
+    def __init__(self, redisClient, clients=50, campaigns=20, contributions=500, rate=50.0,
+                 pollInterval=0.05, timeout=30):
+        self.redisClient = redisClient
+        self.clients = clients
+        self.campaigns = campaigns
+        self.contributions = contributions
+        self.rate = rate
+        self.pollInterval = pollInterval
+        self.timeout = timeout
+
+        self.lock = threading.Lock()
+        self.minedAt = {}
+        self.latencies = []
+        self.lastReceived = None
+
+    def setup_chain(self):
+        # imported here since eth-tester and py-evm are only needed by the benchmark
+        from eth_tester import EthereumTester, PyEVMBackend
+        from web3 import EthereumTesterProvider
+
+        genesis = PyEVMBackend._generate_genesis_params(overrides={'gas_limit': 30000000})
+        tester = EthereumTester(PyEVMBackend(genesis_parameters=genesis))
+
+        # one web3 instance for the traffic and a raw one, without middlewares, for the ingester
+        self.web3 = Web3(EthereumTesterProvider(tester))
+        self.rpc = TesterRpcClient(Web3(EthereumTesterProvider(tester), middlewares=[]), self.lock)
+
+        self.accounts = self.web3.eth.accounts
+        factory = registry.get_contract(self.web3, contractName)
+        txHash = factory.constructor(1000, 30).transact({'from': self.accounts[0]})
+        address = self.web3.eth.get_transaction_receipt(txHash)['contractAddress']
+        self.contract = self.web3.eth.contract(address=address, abi=registry.get_abi(contractName))
+
+    def setup_ingester(self):
+        # point the process ingester to the test chain and the local redis stand-in
+        ingester.rpc = self.rpc
+        ingester.buffer = EventBuffer(self.redisClient)
+        ingester.recent = RecentEvents(self.redisClient)
+        ingester.persister = None
+        ingester.checkpoints = False
+        ingester.lease = None
+        ingester.shards = None
+        ingester.poller = LogPoller(
+            self.rpc, self.contract, contractName, EVENT_NAMES,
+            blockTime=self.pollInterval, minInterval=self.pollInterval,
+        )
+        # skip the deployment, the clients only wait for the generated traffic
+        ingester.poller.nextBlock = self.web3.eth.block_number + 1
+
+    def transact(self, function, transaction):
+        with self.lock:
+            txHash = function.transact(transaction)
+        self.minedAt[Web3.toHex(txHash)] = time.perf_counter()
+
+    def generate_traffic(self):
+        # eth-tester mines a block per transaction, whose timestamp follows the wall clock
+        deadline = int(time.time()) + 60 * 60
+        funders = self.accounts[1:]
+        calls = [
+            (self.contract.functions.newCampaign(
+                self.accounts[index % len(self.accounts)], f'Benchmark campaign {index}', 10 ** 18, deadline,
+            ), {'from': self.accounts[0]})
+            for index in range(self.campaigns)
+        ] + [
+            (self.contract.functions.contribute(index % self.campaigns),
+             {'from': funders[index % len(funders)], 'value': 1000})
+            for index in range(self.contributions)
+        ]
+
+        start = time.perf_counter()
+        for index, (function, transaction) in enumerate(calls):
+            time.sleep(max(0, start + index / self.rate - time.perf_counter()))
+            self.transact(function, transaction)
+
+    async def listen(self, communicator, expected):
+        received = 0
+        while received < expected:
+            try:
+                frame = json.loads(await communicator.receive_from(timeout=self.timeout))
+            except asyncio.TimeoutError:
+                break
+            now = time.perf_counter()
+            for event in frame['events']:
+                minedAt = self.minedAt.get(event['transactionHash'])
+                if minedAt is not None:
+                    self.latencies.append(now - minedAt)
+            received += len(frame['events'])
+            self.lastReceived = now
+        return received
+
+    async def run(self):
+        self.setup_chain()
+        self.setup_ingester()
+
+        # memory retained by the connected sockets
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        communicators = []
+        for _ in range(self.clients):
+            communicator = WebsocketCommunicator(EventsConsumer.as_asgi(), '/ws/socket-server/')
+            connected, _ = await communicator.connect()
+            if not connected:
+                raise ConnectionError('The consumer refused the connection')
+            communicators.append(communicator)
+        memoryPerConnection = (tracemalloc.get_traced_memory()[0] - before) / self.clients
+        tracemalloc.stop()
+
+        # every campaign emits one event, every contribution a NewContribution and a Transfer
+        expected = self.campaigns + 2 * self.contributions
+        start = time.perf_counter()
+        listeners = asyncio.gather(*(self.listen(communicator, expected) for communicator in communicators))
+        await asyncio.get_running_loop().run_in_executor(None, self.generate_traffic)
+        received = await listeners
+
+        for communicator in communicators:
+            await communicator.disconnect()
+        await ingester.stop()
+
+        elapsed = (self.lastReceived or time.perf_counter()) - start
+        rpcCalls = sum(self.rpc.calls.values())
+        return {
+            'clients': self.clients,
+            'events': expected,
+            'delivered': min(received) if received else 0,
+            'throughput': expected / elapsed if elapsed > 0 else None,
+            'latencyP50': percentile(self.latencies, 0.50),
+            'latencyP99': percentile(self.latencies, 0.99),
+            'latencyMean': statistics.mean(self.latencies) if self.latencies else None,
+            'rpcCalls': dict(self.rpc.calls),
+            'rpcCallsPerEvent': rpcCalls / expected if expected else None,
+            'memoryPerConnection': memoryPerConnection,
+        }
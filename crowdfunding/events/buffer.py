@@ -0,0 +1,134 @@
+from redis.exceptions import ResponseError
+import json
+
+'''
+Module buffering the decoded contract events in a redis stream until they are persisted
+'''
+
+# stream holding the buffered events and the consumer group draining it
+STREAM = 'events:stream'
+GROUP = 'persistence'
+CONSUMER = 'flusher'
+
+# approximate maximum number of entries kept in the stream
+MAXLEN = 100000
+
+
+class EventBuffer:
+    '''
+    Redis stream of JSON encoded events read through a consumer group
+
+    Entries stay in the group's pending list until they are acknowledged, so events read
+    right before a crash are delivered again on the next flush.
+    '''
+
+    def __init__(self, client, stream=STREAM, group=GROUP, consumer=CONSUMER, maxlen=MAXLEN):
+        self.client = client
+        self.stream = stream
+        self.group = group
+        self.consumer = consumer
+        self.maxlen = maxlen
+        self.groupReady = False
+
+    def ensure_group(self):
+        if self.groupReady:
+            return
+        try:
+            self.client.xgroup_create(self.stream, self.group, id='0', mkstream=True)
+        except ResponseError as error:
+            # the group already exists
+            if 'BUSYGROUP' not in str(error):
+                raise
+        self.groupReady = True
+
+    def add(self, events):
+        # one round trip for the whole batch
+        pipe = self.client.pipeline(transaction=False)
+        for event in events:
+            pipe.xadd(self.stream, {'data': json.dumps(event)}, maxlen=self.maxlen, approximate=True)
+        pipe.execute()
+
+    def read_batch(self, lastId, count):
+        response = self.client.xreadgroup(self.group, self.consumer, {self.stream: lastId}, count=count)
+        if not response:
+            return []
+        return [(entryId, json.loads(fields[b'data'])) for entryId, fields in response[0][1]]
+
+    def read(self, count=5000):
+        # yield batches of (id, event), starting with entries read before a crash and never acknowledged
+        self.ensure_group()
+        lastId = '0'
+        while True:
+            entries = self.read_batch(lastId, count)
+            if not entries:
+                break
+            lastId = entries[-1][0]
+            yield entries
+
+        while True:
+            entries = self.read_batch('>', count)
+            if not entries:
+                break
+            yield entries
+
+    def ack(self, entryIds, count=5000):
+        pipe = self.client.pipeline(transaction=False)
+        for start in range(0, len(entryIds), count):
+            pipe.xack(self.stream, self.group, *entryIds[start:start + count])
+        pipe.execute()
+
+    def depth(self):
+        return self.client.xlen(self.stream)
+
+    def backlog(self):
+        # entries read but not acknowledged plus those never read by the group,
+        # the lag is only reported by redis 7 and later
+        for group in self.client.xinfo_groups(self.stream):
+            if group['name'].decode() == self.group:
+                return group['pending'] + (group.get('lag') or 0)
+        return 0
+
+
+# sorted set of the latest events sent to the websockets and its size
+RECENT_KEY = 'events:recent'
+RECENT_SIZE = 10000
+
+
+def position_score(blockNumber, logIndex):
+    # orders events by block and log index, exact as a float up to 2^53
+    return blockNumber * 100000 + logIndex
+
+
+class RecentEvents:
+    '''
+    Bounded redis sorted set of the latest websocket messages, scored by chain position
+
+    Clients reconnecting with the position of the last event they received get the
+    following ones replayed from here.
+    '''
+
+    def __init__(self, client, key=RECENT_KEY, size=RECENT_SIZE):
+        self.client = client
+        self.key = key
+        self.size = size
+
+    def add(self, messages):
+        if not messages:
+            return
+        pipe = self.client.pipeline(transaction=False)
+        pipe.zadd(self.key, {
+            json.dumps(message): position_score(message['blockNumber'], message['logIndex']) for message in messages
+        })
+        pipe.zremrangebyrank(self.key, 0, -self.size - 1)
+        pipe.execute()
+
+    def since(self, blockNumber, logIndex, limit):
+        # messages after the given position, and whether older ones were already discarded or left out
+        score = position_score(blockNumber, logIndex)
+        pipe = self.client.pipeline(transaction=False)
+        pipe.zrange(self.key, 0, 0, withscores=True)
+        pipe.zrangebyscore(self.key, f'({score}', '+inf', start=0, num=limit + 1)
+        oldest, members = pipe.execute()
+
+        complete = len(members) <= limit and (not oldest or oldest[0][1] <= score)
+        return [json.loads(member) for member in members[:limit]], complete
@@ -0,0 +1,42 @@
+from .models import Checkpoint
+
+'''
+Module storing the last block whose events have been fully processed
+'''
+
+# checkpoint of the live ingester
+CHECKPOINT_NAME = 'CrowdFunding'
+
+# checkpoint of the history scanned by the backfill command, kept apart so that
+# neither of them moves the other one
+BACKFILL_CHECKPOINT_NAME = 'CrowdFunding:backfill'
+
+# first block polled by the live ingester when it started without a checkpoint, the
+# events before it are stored by the backfill command
+START_CHECKPOINT_NAME = 'CrowdFunding:start'
+
+# saved once the backfilled events are stored and the campaign records rebuilt, the
+# ledgers rebuild themselves when its time changes
+REBUILD_CHECKPOINT_NAME = 'CrowdFunding:rebuild'
+
+
+def load_checkpoint(name=CHECKPOINT_NAME):
+    record = Checkpoint.objects.filter(name=name).first()
+    return record.block if record is not None else None
+
+
+def checkpoint_time(name=CHECKPOINT_NAME):
+    # unix time of the last save
+    record = Checkpoint.objects.filter(name=name).first()
+    return record.timestamp.timestamp() if record is not None else None
+
+
+def save_checkpoint(block, name=CHECKPOINT_NAME):
+    Checkpoint.objects.update_or_create(name=name, defaults={'block': block})
+
+
+def advance_checkpoint(block, name=CHECKPOINT_NAME):
+    # only moves the checkpoint forward, whatever the order of the writers
+    _, created = Checkpoint.objects.get_or_create(name=name, defaults={'block': block})
+    if not created:
+        Checkpoint.objects.filter(name=name, block__lt=block).update(block=block)
@@ -0,0 +1,155 @@
+from asgiref.sync import sync_to_async
+from .persistence import persist_in_worker
+from uuid import uuid4
+import asyncio
+import logging
+import os
+import socket
+import time
+
+'''
+Module coordinating the nodes sharing the redis server: a lease elects the only
+ingester of the cluster and the standby nodes share the backfill block ranges
+'''
+
+logger = logging.getLogger(__name__)
+
+# key holding the token of the current ingester
+LEASE_KEY = 'events:ingester:lease'
+
+# block ranges waiting for a node and ranges claimed by a node with their expiry time
+SHARDS_KEY = 'events:backfill:shards'
+CLAIMS_KEY = 'events:backfill:claims'
+
+# extend or delete the lease only if this node still holds it
+RENEW_SCRIPT = '''
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('PEXPIRE', KEYS[1], ARGV[2])
+end
+return 0
+'''
+RELEASE_SCRIPT = '''
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+'''
+
+# move a range from the queue to the claims in one step, so a crash can not lose it
+CLAIM_SCRIPT = '''
+local shard = redis.call('LPOP', KEYS[1])
+if shard then
+    redis.call('HSET', KEYS[2], shard, ARGV[1])
+end
+return shard
+'''
+
+
+class LeaseLock:
+    '''
+    Redis key held by a single node, which has to renew it before `ttl` seconds
+
+    The holder renews it every `heartbeat` seconds and deletes it when stopping, so
+    another node takes over within a heartbeat after a clean shutdown and within
+    the ttl after a crash.
+    '''
+
+    def __init__(self, client, key=LEASE_KEY, ttl=10, heartbeat=2):
+        self.client = client
+        self.key = key
+        self.ttl = ttl
+        self.heartbeat = heartbeat
+        self.token = f'{socket.gethostname()}:{os.getpid()}:{uuid4().hex}'
+        self.renewScript = client.register_script(RENEW_SCRIPT)
+        self.releaseScript = client.register_script(RELEASE_SCRIPT)
+
+    def acquire(self):
+        ttl = int(self.ttl * 1000)
+        return bool(self.client.set(self.key, self.token, nx=True, px=ttl)) or self.renew()
+
+    def renew(self):
+        return bool(self.renewScript(keys=[self.key], args=[self.token, int(self.ttl * 1000)]))
+
+    def release(self):
+        self.releaseScript(keys=[self.key], args=[self.token])
+
+    def holder(self):
+        holder = self.client.get(self.key)
+        return holder.decode() if holder is not None else None
+
+
+class ShardQueue:
+    '''
+    Block ranges to backfill, claimed one at a time by the nodes
+
+    A claim expires after `claimTtl` seconds so the range of a node that died goes
+    back to the queue, storing the same events twice is harmless.
+    '''
+
+    def __init__(self, client, claimTtl=10 * 60):
+        self.client = client
+        self.claimTtl = claimTtl
+        self.claimScript = client.register_script(CLAIM_SCRIPT)
+
+    def submit(self, fromBlock, toBlock, shardSize):
+        shards = [
+            f'{start}-{min(start + shardSize - 1, toBlock)}' for start in range(fromBlock, toBlock + 1, shardSize)
+        ]
+        if shards:
+            self.client.rpush(SHARDS_KEY, *shards)
+        return len(shards)
+
+    def claim(self):
+        shard = self.claimScript(keys=[SHARDS_KEY, CLAIMS_KEY], args=[time.time() + self.claimTtl])
+        if shard is None:
+            return None
+        fromBlock, toBlock = shard.decode().split('-')
+        return int(fromBlock), int(toBlock)
+
+    def complete(self, fromBlock, toBlock):
+        self.client.hdel(CLAIMS_KEY, f'{fromBlock}-{toBlock}')
+
+    def release(self, fromBlock, toBlock):
+        # give a range back, only if the claim was not already requeued
+        shard = f'{fromBlock}-{toBlock}'
+        if self.client.hdel(CLAIMS_KEY, shard):
+            self.client.lpush(SHARDS_KEY, shard)
+
+    def requeue_expired(self):
+        now = time.time()
+        for shard, expiry in self.client.hgetall(CLAIMS_KEY).items():
+            if float(expiry) < now and self.client.hdel(CLAIMS_KEY, shard):
+                logger.warning('Requeuing expired backfill range %s', shard.decode())
+                self.client.rpush(SHARDS_KEY, shard)
+
+    def remaining(self):
+        return self.client.llen(SHARDS_KEY) + self.client.hlen(CLAIMS_KEY)
+
+
+async def store_shard(events, lastBlock):
+    # ranges end in any order, the command which queued them moves the backfill checkpoint
+    # and rebuilds the campaign records once all of them are stored. Standby web nodes
+    # keep their thread sensitive executor for the websocket handshakes
+    await sync_to_async(persist_in_worker, thread_sensitive=False)(events, project=False)
+
+
+async def process_shards(queue, backfill, idle=5):
+    # backfill the ranges of the queue until cancelled
+    while True:
+        shard = await sync_to_async(queue.claim, thread_sensitive=False)()
+        if shard is None:
+            await asyncio.sleep(idle)
+            continue
+
+        logger.info('Backfilling blocks %d-%d', *shard)
+        try:
+            await backfill.run(*shard, store_shard)
+        except asyncio.CancelledError:
+            await sync_to_async(queue.release, thread_sensitive=False)(*shard)
+            raise
+        except Exception:
+            logger.exception('Backfilling blocks %d-%d failed', *shard)
+            await sync_to_async(queue.release, thread_sensitive=False)(*shard)
+            await asyncio.sleep(idle)
+            continue
+        await sync_to_async(queue.complete, thread_sensitive=False)(*shard)
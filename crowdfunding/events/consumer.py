@@ -1,95 +1,122 @@
-from channels.generic.websocket import WebsocketConsumer
-from web3 import Web3
-from .models import Event
+from asgiref.sync import sync_to_async
+from channels.generic.websocket import AsyncWebsocketConsumer
+from collections import Counter, deque
+from urllib.parse import parse_qs
+from .ingester import EVENTS_GROUP, ingester
+from .metrics import CONNECTIONS, EVENTS_DROPPED, FRAMES_SENT, SEND_QUEUE_DEPTH
+import asyncio
 import json
-import redis
-import time
 
-# connect to a node
-providerUrl = 'https://ropsten.infura.io/v3/77f3d31d6304460580a326ac5bd0a948'
-web3 = Web3(Web3.HTTPProvider(providerUrl))
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
 
-# retrieve contract
-contractAddress = '0x86D219D65452b013912B2af7b2E65E903fa3777d'
-contractAbi = json.loads(
-    '[{"inputs":[{"internalType":"uint256","name":"_initialSupply","type":"uint256"},{"internalType":"uint256","name":"_minPeriodOfDeadline","type":"uint256"}],"stateMutability":"nonpayable","type":"constructor"},{"anonymous":false,"inputs":[{"indexed":true,"internalType":"address","name":"owner","type":"address"},{"indexed":true,"internalType":"address","name":"spender","type":"address"},{"indexed":false,"internalType":"uint256","name":"value","type":"uint256"}],"name":"Approval","type":"event"},{"anonymous":false,"inputs":[{"indexed":true,"internalType":"uint256","name":"campaignID","type":"uint256"},{"indexed":true,"internalType":"uint256","name":"timestamp","type":"uint256"}],"name":"GoalReached","type":"event"},{"anonymous":false,"inputs":[{"indexed":true,"internalType":"address","name":"minter","type":"address"},{"indexed":true,"internalType":"address","name":"to","type":"address"},{"indexed":true,"internalType":"uint256","name":"amount","type":"uint256"}],"name":"Mint","type":"event"},{"anonymous":false,"inputs":[{"indexed":true,"internalType":"address","name":"account","type":"address"}],"name":"MinterAdded","type":"event"},{"anonymous":false,"inputs":[{"indexed":true,"internalType":"address","name":"account","type":"address"}],"name":"MinterRemoved","type":"event"},{"anonymous":false,"inputs":[{"indexed":true,"internalType":"uint256","name":"campaignID","type":"uint256"},{"indexed":true,"internalType":"address","name":"beneficiary","type":"address"},{"indexed":true,"internalType":"uint256","name":"deadline","type":"uint256"},{"indexed":false,"internalType":"uint256","name":"amount","type":"uint256"}],"name":"NewCampaignCreated","type":"event"},{"anonymous":false,"inputs":[{"indexed":true,"internalType":"address","name":"from","type":"address"},{"indexed":true,"internalType":"uint256","name":"campaignID","type":"uint256"},{"indexed":true,"internalType":"uint256","name":"amountFunded","type":"uint256"}],"name":"NewContribution","type":"event"},{"anonymous":false,"inputs":[{"indexed":true,"internalType":"address","name":"from","type":"address"},{"indexed":true,"internalType":"address","name":"to","type":"address"}],"name":"NewOwnership","type":"event"},{"anonymous":false,"inputs":[{"indexed":true,"internalType":"address","name":"from","type":"address"},{"indexed":true,"internalType":"address","name":"to","type":"address"}],"name":"NewPendingOwnership","type":"event"},{"anonymous":false,"inputs":[{"indexed":true,"internalType":"address","name":"from","type":"address"},{"indexed":true,"internalType":"uint256","name":"amount","type":"uint256"}],"name":"OfferReceived","type":"event"},{"anonymous":false,"inputs":[{"indexed":true,"internalType":"address","name":"refunded","type":"address"},{"indexed":true,"internalType":"uint256","name":"amount","type":"uint256"},{"indexed":true,"internalType":"uint256","name":"campaignID","type":"uint256"}],"name":"Refund","type":"event"},{"anonymous":false,"inputs":[{"indexed":true,"internalType":"address","name":"from","type":"address"},{"indexed":true,"internalType":"address","name":"to","type":"address"},{"indexed":false,"internalType":"uint256","name":"value","type":"uint256"}],"name":"Transfer","type":"event"},{"inputs":[],"name":"acceptOwnership","outputs":[],"stateMutability":"nonpayable","type":"function"},{"inputs":[{"internalType":"address","name":"_account","type":"address"}],"name":"addMinter","outputs":[],"stateMutability":"nonpayable","type":"function"},{"inputs":[{"internalType":"address","name":"owner","type":"address"},{"internalType":"address","name":"spender","type":"address"}],"name":"allowance","outputs":[{"internalType":"uint256","name":"","type":"uint256"}],"stateMutability":"view","type":"function"},{"inputs":[{"internalType":"address","name":"spender","type":"address"},{"internalType":"uint256","name":"amount","type":"uint256"}],"name":"approve","outputs":[{"internalType":"bool","name":"","type":"bool"}],"stateMutability":"nonpayable","type":"function"},{"inputs":[{"internalType":"address","name":"account","type":"address"}],"name":"balanceOf","outputs":[{"internalType":"uint256","name":"","type":"uint256"}],"stateMutability":"view","type":"function"},{"inputs":[{"internalType":"uint256","name":"amount","type":"uint256"}],"name":"burn","outputs":[],"stateMutability":"nonpayable","type":"function"},{"inputs":[{"internalType":"address","name":"account","type":"address"},{"internalType":"uint256","name":"amount","type":"uint256"}],"name":"burnFrom","outputs":[],"stateMutability":"nonpayable","type":"function"},{"inputs":[{"internalType":"uint256","name":"","type":"uint256"}],"name":"campaigns","outputs":[{"internalType":"address payable","name":"beneficiary","type":"address"},{"internalType":"string","name":"description","type":"string"},{"internalType":"uint256","name":"fundingGoal","type":"uint256"},{"internalType":"uint256","name":"deadline","type":"uint256"},{"internalType":"uint256","name":"numFunders","type":"uint256"},{"internalType":"uint256","name":"amount","type":"uint256"},{"internalType":"bool","name":"completed","type":"bool"}],"stateMutability":"view","type":"function"},{"inputs":[{"internalType":"uint256","name":"campaignID","type":"uint256"}],"name":"checkGoalReached","outputs":[{"internalType":"bool","name":"","type":"bool"}],"stateMutability":"nonpayable","type":"function"},{"inputs":[{"internalType":"address payable","name":"_recipient","type":"address"}],"name":"collect","outputs":[],"stateMutability":"nonpayable","type":"function"},{"inputs":[{"internalType":"uint256","name":"campaignID","type":"uint256"}],"name":"contribute","outputs":[],"stateMutability":"payable","type":"function"},{"inputs":[],"name":"decimals","outputs":[{"internalType":"uint8","name":"","type":"uint8"}],"stateMutability":"view","type":"function"},{"inputs":[{"internalType":"address","name":"spender","type":"address"},{"internalType":"uint256","name":"subtractedValue","type":"uint256"}],"name":"decreaseAllowance","outputs":[{"internalType":"bool","name":"","type":"bool"}],"stateMutability":"nonpayable","type":"function"},{"inputs":[],"name":"governor","outputs":[{"internalType":"address","name":"","type":"address"}],"stateMutability":"view","type":"function"},{"inputs":[{"internalType":"address","name":"spender","type":"address"},{"internalType":"uint256","name":"addedValue","type":"uint256"}],"name":"increaseAllowance","outputs":[{"internalType":"bool","name":"","type":"bool"}],"stateMutability":"nonpayable","type":"function"},{"inputs":[{"internalType":"address","name":"_account","type":"address"}],"name":"isMinter","outputs":[{"internalType":"bool","name":"","type":"bool"}],"stateMutability":"view","type":"function"},{"inputs":[],"name":"minPeriodOfDeadline","outputs":[{"internalType":"uint256","name":"","type":"uint256"}],"stateMutability":"view","type":"function"},{"inputs":[{"internalType":"address","name":"_to","type":"address"},{"internalType":"uint256","name":"_amount","type":"uint256"}],"name":"mint","outputs":[],"stateMutability":"nonpayable","type":"function"},{"inputs":[],"name":"name","outputs":[{"internalType":"string","name":"","type":"string"}],"stateMutability":"view","type":"function"},{"inputs":[{"internalType":"address payable","name":"_beneficiary","type":"address"},{"internalType":"string","name":"_description","type":"string"},{"internalType":"uint256","name":"_goal","type":"uint256"},{"internalType":"uint256","name":"_deadline","type":"uint256"}],"name":"newCampaign","outputs":[],"stateMutability":"nonpayable","type":"function"},{"inputs":[{"internalType":"address","name":"","type":"address"}],"name":"nonces","outputs":[{"internalType":"uint256","name":"","type":"uint256"}],"stateMutability":"view","type":"function"},{"inputs":[],"name":"numCampaigns","outputs":[{"internalType":"uint256","name":"","type":"uint256"}],"stateMutability":"view","type":"function"},{"inputs":[],"name":"pendingGovernor","outputs":[{"internalType":"address","name":"","type":"address"}],"stateMutability":"view","type":"function"},{"inputs":[{"internalType":"uint256","name":"campaignID","type":"uint256"}],"name":"refund","outputs":[],"stateMutability":"nonpayable","type":"function"},{"inputs":[{"internalType":"address","name":"_account","type":"address"}],"name":"removeMinter","outputs":[],"stateMutability":"nonpayable","type":"function"},{"inputs":[],"name":"renounceMinter","outputs":[],"stateMutability":"nonpayable","type":"function"},{"inputs":[],"name":"symbol","outputs":[{"internalType":"string","name":"","type":"string"}],"stateMutability":"view","type":"function"},{"inputs":[],"name":"totalSupply","outputs":[{"internalType":"uint256","name":"","type":"uint256"}],"stateMutability":"view","type":"function"},{"inputs":[{"internalType":"address","name":"recipient","type":"address"},{"internalType":"uint256","name":"amount","type":"uint256"}],"name":"transfer","outputs":[{"internalType":"bool","name":"","type":"bool"}],"stateMutability":"nonpayable","type":"function"},{"inputs":[{"internalType":"address","name":"sender","type":"address"},{"internalType":"address","name":"recipient","type":"address"},{"internalType":"uint256","name":"amount","type":"uint256"}],"name":"transferFrom","outputs":[{"internalType":"bool","name":"","type":"bool"}],"stateMutability":"nonpayable","type":"function"},{"inputs":[{"internalType":"address","name":"_newGovernor","type":"address"}],"name":"transferOwnership","outputs":[],"stateMutability":"nonpayable","type":"function"},{"stateMutability":"payable","type":"receive"}]');
-contract = web3.eth.contract(address=contractAddress, abi=contractAbi)
+# time spent collecting events before sending them in a single frame
+tick = 0.2
 
-# connect to redis server
-client = redis.StrictRedis(host='localhost', port=6379, db=0)
+# events waiting to be sent to a single client, older ones are dropped when it is full
+queueSize = 1000
+
+# maximum number of events replayed to a reconnecting client
+maxReplay = 1000
+
+
+def parse_cursor(cursor):
+    # cursors have the form <block number>-<log index>
+    try:
+        blockNumber, logIndex = cursor.split('-')
+        return int(blockNumber), int(logIndex)
+    except (AttributeError, ValueError):
+        return None
 
 
 # django view for websockets connection
-class EventsConsumer(WebsocketConsumer):
-
-    def connect(self):
-        self.accept()
-
-        # check for web3 connection
-        if web3.isConnected():
-
-            # set filters for each event
-            newCampaignFilter = contract.events.NewCampaignCreated.createFilter(fromBlock='latest')
-            newContributionFilter = contract.events.NewContribution.createFilter(fromBlock='latest')
-            refundFilter = contract.events.Refund.createFilter(fromBlock='latest')
-            goalReachedFilter = contract.events.GoalReached.createFilter(fromBlock='latest')
-            offerReceivedFilter = contract.events.OfferReceived.createFilter(fromBlock='latest')
-            transferFilter = contract.events.Transfer.createFilter(fromBlock='latest')
-
-            filters = [newCampaignFilter, newContributionFilter, refundFilter, goalReachedFilter, offerReceivedFilter,
-                       transferFilter]
-
-            # set time to spend before save events in db
-            epoch = 5 * 60
-            events = []
-            last = time.time()
-
-            while True:
-                for filter in filters:
-                    time.sleep(3)
-
-                    # listen to last events
-                    for event in filter.get_new_entries():
-                        time.sleep(1)
-                        event = json.loads(Web3.toJSON(event))
-                        eventName = event['event']
-
-                        # send event data to webpage to display
-                        self.send(text_data=json.dumps((
-                            {
-                                'eventName': eventName,
-                                'eventArgs': event['args'],
-                            }
-                        )))
-
-                        # update list of events
-                        if eventName not in events:
-                            events.append(eventName)
-                            print(f'New event added: ' + eventName)
-
-                        # add event in redis db
-                        print('ADDED')
-                        client.lpush(eventName, str(event['args']))
-
-                        # save data in mongodb and remove it from redis db
-                        if time.time() - last > epoch:
-                            print('Savings...')
-                            print(f'Numero eventi: {len(events)}')
-                            for event in events:
-                                print('Saving' + event)
-                                # add to mongodb
-                                record = Event.objects.create(type=event, times=client.llen(event))
-                                record.save()
-                                print(client.llen(event))
-                                # delete data
-                                while (client.llen(event) != 0):
-                                    client.rpop(event)
-                                # print(client.get(event))
-
-                            events.clear()
-
-        else:
-            print("Connection to web3 provider failed...")
-
-    def disconnect(self, code):
-        self.close()
+class EventsConsumer(AsyncWebsocketConsumer):
+
+    async def connect(self):
+        self.queue = deque()
+        self.dropped = Counter()
+        self.truncated = False
+        self.position = (-1, -1)
+        self.ready = asyncio.Event()
+        self.sender = None
+        self.counted = False
+
+        # make sure the shared ingester is polling the chain
+        ingester.start()
+
+        # receive events published by the ingester
+        await self.channel_layer.group_add(EVENTS_GROUP, self.channel_name)
+
+        # binary frames when the client asks for them and msgpack is installed
+        self.binary = msgpack is not None and 'msgpack' in self.scope.get('subprotocols', [])
+        await self.accept(subprotocol='msgpack' if self.binary else None)
+        CONNECTIONS.inc()
+        self.counted = True
+
+        # replay what the client missed since its last event, group messages
+        # are only handled once connect returns so nothing is lost in between
+        query = parse_qs(self.scope['query_string'].decode())
+        cursor = parse_cursor(query.get('cursor', [None])[0])
+        if cursor is not None:
+            self.position = cursor
+            messages, complete = await sync_to_async(ingester.recent.since, thread_sensitive=False)(*cursor, maxReplay)
+            self.truncated = not complete
+            self.enqueue(messages)
+
+        self.sender = asyncio.ensure_future(self.deliver())
+
+    async def disconnect(self, code):
+        if self.sender is not None:
+            self.sender.cancel()
+        if getattr(self, 'counted', False):
+            CONNECTIONS.dec()
+            self.counted = False
+        await self.channel_layer.group_discard(EVENTS_GROUP, self.channel_name)
+
+    async def chain_events(self, message):
+        self.enqueue(message['events'])
+
+    def enqueue(self, messages):
+        for message in messages:
+            position = (message['blockNumber'], message['logIndex'])
+            if position <= self.position:
+                continue
+            self.position = position
+
+            # slow client, summarize the oldest events instead of sending them
+            if len(self.queue) >= queueSize:
+                self.dropped[self.queue.popleft()['eventName']] += 1
+            self.queue.append(message)
+
+        if self.queue or self.truncated:
+            self.ready.set()
+
+    async def deliver(self):
+        while True:
+            await self.ready.wait()
+            # let events arriving during the tick share the same frame
+            await asyncio.sleep(tick)
+            self.ready.clear()
+
+            events = list(self.queue)
+            self.queue.clear()
+            SEND_QUEUE_DEPTH.observe(len(events))
+            frame = {'events': events}
+            if events:
+                last = events[-1]
+                frame['cursor'] = f"{last['blockNumber']}-{last['logIndex']}"
+            if self.dropped:
+                frame['dropped'] = dict(self.dropped)
+                EVENTS_DROPPED.inc(sum(self.dropped.values()))
+                self.dropped.clear()
+            if self.truncated:
+                frame['truncated'] = True
+                self.truncated = False
+
+            if self.binary:
+                await self.send(bytes_data=msgpack.packb(frame))
+            else:
+                await self.send(text_data=json.dumps(frame))
+            FRAMES_SENT.inc()
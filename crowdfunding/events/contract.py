@@ -0,0 +1,50 @@
+from functools import lru_cache
+from web3 import Web3
+from .providers import PooledProvider, ProviderPool
+from .reader import ContractReader
+from . import registry
+
+'''
+Module holding the connection to the node and the deployed crowdfunding contract
+'''
+
+# nodes answering the requests, the healthiest one is used and the others take over on failure
+providerUrls = [
+    'https://ropsten.infura.io/v3/77f3d31d6304460580a326ac5bd0a948',
+]
+
+# blocks after which blocks, receipts and logs are considered final and cached
+confirmations = 12
+
+# retrieve contract
+contractName = 'CrowdFunding'
+contractAddress = '0x86D219D65452b013912B2af7b2E65E903fa3777d'
+
+# block the contract was deployed at, used as starting point when there is no checkpoint
+deploymentBlock = None
+
+
+@lru_cache(maxsize=None)
+def get_pool():
+    # endpoints, rate limits and cache shared by every client of the process
+    return ProviderPool(providerUrls, confirmations)
+
+
+@lru_cache(maxsize=None)
+def get_provider():
+    return PooledProvider(get_pool())
+
+
+@lru_cache(maxsize=None)
+def get_web3():
+    return Web3(get_provider())
+
+
+def get_contract():
+    return registry.get_contract(get_web3(), contractName, contractAddress)
+
+
+@lru_cache(maxsize=None)
+def get_reader():
+    # batched reader of the contract view functions
+    return ContractReader(contractName, contractAddress, get_provider())
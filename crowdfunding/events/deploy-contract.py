@@ -1,22 +1,21 @@
 from web3 import Web3
-import json
+from providers import PooledProvider, ProviderPool
+from registry import get_abi, get_bytecode
 
 '''
 Module used to deploy the crowdfunding contract
 '''
 
-# connect to a node
-providerUrl = 'https://ropsten.infura.io/v3/77f3d31d6304460580a326ac5bd0a948'
-web3 = Web3(Web3.HTTPProvider(providerUrl))
+# connect to the nodes, add urls to fail over between providers
+providerUrls = ['https://ropsten.infura.io/v3/77f3d31d6304460580a326ac5bd0a948']
+web3 = Web3(PooledProvider(ProviderPool(providerUrls)))
 
 # set default account
 #web3.eth.default_account = web3.eth.accounts[0]
 acct = web3.eth.account.privateKeyToAccount('0xb2bda96fda35ff35cad5ccd2389539d2572ca96d40af48e2c9da5742a32215fa')
 
-contractAbi = json.loads('[{"inputs":[{"internalType":"uint256","name":"_initialSupply","type":"uint256"},{"internalType":"uint256","name":"_minPeriodOfDeadline","type":"uint256"}],"stateMutability":"nonpayable","type":"constructor"},{"anonymous":false,"inputs":[{"indexed":true,"internalType":"address","name":"owner","type":"address"},{"indexed":true,"internalType":"address","name":"spender","type":"address"},{"indexed":false,"internalType":"uint256","name":"value","type":"uint256"}],"name":"Approval","type":"event"},{"anonymous":false,"inputs":[{"indexed":true,"internalType":"uint256","name":"campaignID","type":"uint256"},{"indexed":true,"internalType":"uint256","name":"timestamp","type":"uint256"}],"name":"GoalReached","type":"event"},{"anonymous":false,"inputs":[{"indexed":true,"internalType":"address","name":"minter","type":"address"},{"indexed":true,"internalType":"address","name":"to","type":"address"},{"indexed":true,"internalType":"uint256","name":"amount","type":"uint256"}],"name":"Mint","type":"event"},{"anonymous":false,"inputs":[{"indexed":true,"internalType":"address","name":"account","type":"address"}],"name":"MinterAdded","type":"event"},{"anonymous":false,"inputs":[{"indexed":true,"internalType":"address","name":"account","type":"address"}],"name":"MinterRemoved","type":"event"},{"anonymous":false,"inputs":[{"indexed":true,"internalType":"uint256","name":"campaignID","type":"uint256"},{"indexed":true,"internalType":"address","name":"beneficiary","type":"address"},{"indexed":true,"internalType":"uint256","name":"deadline","type":"uint256"},{"indexed":false,"internalType":"uint256","name":"amount","type":"uint256"}],"name":"NewCampaignCreated","type":"event"},{"anonymous":false,"inputs":[{"indexed":true,"internalType":"address","name":"from","type":"address"},{"indexed":true,"internalType":"uint256","name":"campaignID","type":"uint256"},{"indexed":true,"internalType":"uint256","name":"amountFunded","type":"uint256"}],"name":"NewContribution","type":"event"},{"anonymous":false,"inputs":[{"indexed":true,"internalType":"address","name":"from","type":"address"},{"indexed":true,"internalType":"address","name":"to","type":"address"}],"name":"NewOwnership","type":"event"},{"anonymous":false,"inputs":[{"indexed":true,"internalType":"address","name":"from","type":"address"},{"indexed":true,"internalType":"address","name":"to","type":"address"}],"name":"NewPendingOwnership","type":"event"},{"anonymous":false,"inputs":[{"indexed":true,"internalType":"address","name":"from","type":"address"},{"indexed":true,"internalType":"uint256","name":"amount","type":"uint256"}],"name":"OfferReceived","type":"event"},{"anonymous":false,"inputs":[{"indexed":true,"internalType":"address","name":"refunded","type":"address"},{"indexed":true,"internalType":"uint256","name":"amount","type":"uint256"},{"indexed":true,"internalType":"uint256","name":"campaignID","type":"uint256"}],"name":"Refund","type":"event"},{"anonymous":false,"inputs":[{"indexed":true,"internalType":"address","name":"from","type":"address"},{"indexed":true,"internalType":"address","name":"to","type":"address"},{"indexed":false,"internalType":"uint256","name":"value","type":"uint256"}],"name":"Transfer","type":"event"},{"inputs":[],"name":"acceptOwnership","outputs":[],"stateMutability":"nonpayable","type":"function"},{"inputs":[{"internalType":"address","name":"_account","type":"address"}],"name":"addMinter","outputs":[],"stateMutability":"nonpayable","type":"function"},{"inputs":[{"internalType":"address","name":"owner","type":"address"},{"internalType":"address","name":"spender","type":"address"}],"name":"allowance","outputs":[{"internalType":"uint256","name":"","type":"uint256"}],"stateMutability":"view","type":"function"},{"inputs":[{"internalType":"address","name":"spender","type":"address"},{"internalType":"uint256","name":"amount","type":"uint256"}],"name":"approve","outputs":[{"internalType":"bool","name":"","type":"bool"}],"stateMutability":"nonpayable","type":"function"},{"inputs":[{"internalType":"address","name":"account","type":"address"}],"name":"balanceOf","outputs":[{"internalType":"uint256","name":"","type":"uint256"}],"stateMutability":"view","type":"function"},{"inputs":[{"internalType":"uint256","name":"amount","type":"uint256"}],"name":"burn","outputs":[],"stateMutability":"nonpayable","type":"function"},{"inputs":[{"internalType":"address","name":"account","type":"address"},{"internalType":"uint256","name":"amount","type":"uint256"}],"name":"burnFrom","outputs":[],"stateMutability":"nonpayable","type":"function"},{"inputs":[{"internalType":"uint256","name":"","type":"uint256"}],"name":"campaigns","outputs":[{"internalType":"address payable","name":"beneficiary","type":"address"},{"internalType":"string","name":"description","type":"string"},{"internalType":"uint256","name":"fundingGoal","type":"uint256"},{"internalType":"uint256","name":"deadline","type":"uint256"},{"internalType":"uint256","name":"numFunders","type":"uint256"},{"internalType":"uint256","name":"amount","type":"uint256"},{"internalType":"bool","name":"completed","type":"bool"}],"stateMutability":"view","type":"function"},{"inputs":[{"internalType":"uint256","name":"campaignID","type":"uint256"}],"name":"checkGoalReached","outputs":[{"internalType":"bool","name":"","type":"bool"}],"stateMutability":"nonpayable","type":"function"},{"inputs":[{"internalType":"address payable","name":"_recipient","type":"address"}],"name":"collect","outputs":[],"stateMutability":"nonpayable","type":"function"},{"inputs":[{"internalType":"uint256","name":"campaignID","type":"uint256"}],"name":"contribute","outputs":[],"stateMutability":"payable","type":"function"},{"inputs":[],"name":"decimals","outputs":[{"internalType":"uint8","name":"","type":"uint8"}],"stateMutability":"view","type":"function"},{"inputs":[{"internalType":"address","name":"spender","type":"address"},{"internalType":"uint256","name":"subtractedValue","type":"uint256"}],"name":"decreaseAllowance","outputs":[{"internalType":"bool","name":"","type":"bool"}],"stateMutability":"nonpayable","type":"function"},{"inputs":[],"name":"governor","outputs":[{"internalType":"address","name":"","type":"address"}],"stateMutability":"view","type":"function"},{"inputs":[{"internalType":"address","name":"spender","type":"address"},{"internalType":"uint256","name":"addedValue","type":"uint256"}],"name":"increaseAllowance","outputs":[{"internalType":"bool","name":"","type":"bool"}],"stateMutability":"nonpayable","type":"function"},{"inputs":[{"internalType":"address","name":"_account","type":"address"}],"name":"isMinter","outputs":[{"internalType":"bool","name":"","type":"bool"}],"stateMutability":"view","type":"function"},{"inputs":[],"name":"minPeriodOfDeadline","outputs":[{"internalType":"uint256","name":"","type":"uint256"}],"stateMutability":"view","type":"function"},{"inputs":[{"internalType":"address","name":"_to","type":"address"},{"internalType":"uint256","name":"_amount","type":"uint256"}],"name":"mint","outputs":[],"stateMutability":"nonpayable","type":"function"},{"inputs":[],"name":"name","outputs":[{"internalType":"string","name":"","type":"string"}],"stateMutability":"view","type":"function"},{"inputs":[{"internalType":"address payable","name":"_beneficiary","type":"address"},{"internalType":"string","name":"_description","type":"string"},{"internalType":"uint256","name":"_goal","type":"uint256"},{"internalType":"uint256","name":"_deadline","type":"uint256"}],"name":"newCampaign","outputs":[],"stateMutability":"nonpayable","type":"function"},{"inputs":[{"internalType":"address","name":"","type":"address"}],"name":"nonces","outputs":[{"internalType":"uint256","name":"","type":"uint256"}],"stateMutability":"view","type":"function"},{"inputs":[],"name":"numCampaigns","outputs":[{"internalType":"uint256","name":"","type":"uint256"}],"stateMutability":"view","type":"function"},{"inputs":[],"name":"pendingGovernor","outputs":[{"internalType":"address","name":"","type":"address"}],"stateMutability":"view","type":"function"},{"inputs":[{"internalType":"uint256","name":"campaignID","type":"uint256"}],"name":"refund","outputs":[],"stateMutability":"nonpayable","type":"function"},{"inputs":[{"internalType":"address","name":"_account","type":"address"}],"name":"removeMinter","outputs":[],"stateMutability":"nonpayable","type":"function"},{"inputs":[],"name":"renounceMinter","outputs":[],"stateMutability":"nonpayable","type":"function"},{"inputs":[],"name":"symbol","outputs":[{"internalType":"string","name":"","type":"string"}],"stateMutability":"view","type":"function"},{"inputs":[],"name":"totalSupply","outputs":[{"internalType":"uint256","name":"","type":"uint256"}],"stateMutability":"view","type":"function"},{"inputs":[{"internalType":"address","name":"recipient","type":"address"},{"internalType":"uint256","name":"amount","type":"uint256"}],"name":"transfer","outputs":[{"internalType":"bool","name":"","type":"bool"}],"stateMutability":"nonpayable","type":"function"},{"inputs":[{"internalType":"address","name":"sender","type":"address"},{"internalType":"address","name":"recipient","type":"address"},{"internalType":"uint256","name":"amount","type":"uint256"}],"name":"transferFrom","outputs":[{"internalType":"bool","name":"","type":"bool"}],"stateMutability":"nonpayable","type":"function"},{"inputs":[{"internalType":"address","name":"_newGovernor","type":"address"}],"name":"transferOwnership","outputs":[],"stateMutability":"nonpayable","type":"function"},{"stateMutability":"payable","type":"receive"}]');
-contractBytecode = "60806040523480156200001157600080fd5b50604051620045063803806200450683398181016040528101906200003791906200044d565b816040518060400160405280600b81526020017f43726f776420546f6b656e0000000000000000000000000000000000000000008152506040518060400160405280600381526020017f43574400000000000000000000000000000000000000000000000000000000008152508160059080519060200190620000bc92919062000386565b508060069080519060200190620000d592919062000386565b505050620000ee336200012160201b62001fea1760201c565b6200010033826200016460201b60201c565b6200011133620002de60201b60201c565b5080600b8190555050506200065f565b806000806101000a81548173ffffffffffffffffffffffffffffffffffffffff021916908373ffffffffffffffffffffffffffffffffffffffff16021790555050565b600073ffffffffffffffffffffffffffffffffffffffff168273ffffffffffffffffffffffffffffffffffffffff161415620001d7576040517f08c379a0000000000000000000000000000000000000000000000000000000008152600401620001ce90620004cc565b60405180910390fd5b620001eb600083836200037c60201b60201c565b8060046000828254620001ff91906200051c565b9250508190555080600260008473ffffffffffffffffffffffffffffffffffffffff1673ffffffffffffffffffffffffffffffffffffffff16815260200190815260200160002060008282546200025791906200051c565b925050819055508173ffffffffffffffffffffffffffffffffffffffff16600073ffffffffffffffffffffffffffffffffffffffff167fddf252ad1be2c89b69c2b068fc378daa952ba7f163c4a11628f55a4df523b3ef83604051620002be9190620004ee565b60405180910390a3620002da600083836200038160201b60201c565b5050565b6001600760008373ffffffffffffffffffffffffffffffffffffffff1673ffffffffffffffffffffffffffffffffffffffff16815260200190815260200160002060006101000a81548160ff0219169083151502179055508073ffffffffffffffffffffffffffffffffffffffff167f6ae172837ea30b801fbfcdd4108aa1d5bf8ff775444fd70256b44e6bf3dfc3f660405160405180910390a250565b505050565b505050565b828054620003949062000583565b90600052602060002090601f016020900481019282620003b8576000855562000404565b82601f10620003d357805160ff191683800117855562000404565b8280016001018555821562000404579182015b8281111562000403578251825591602001919060010190620003e6565b5b50905062000413919062000417565b5090565b5b808211156200043257600081600090555060010162000418565b5090565b600081519050620004478162000645565b92915050565b6000806040838503121562000467576200046662000617565b5b6000620004778582860162000436565b92505060206200048a8582860162000436565b9150509250929050565b6000620004a3601f836200050b565b9150620004b0826200061c565b602082019050919050565b620004c68162000579565b82525050565b60006020820190508181036000830152620004e78162000494565b9050919050565b6000602082019050620005056000830184620004bb565b92915050565b600082825260208201905092915050565b6000620005298262000579565b9150620005368362000579565b9250827fffffffffffffffffffffffffffffffffffffffffffffffffffffffffffffffff038211156200056e576200056d620005b9565b5b828201905092915050565b6000819050919050565b600060028204905060018216806200059c57607f821691505b60208210811415620005b357620005b2620005e8565b5b50919050565b7f4e487b7100000000000000000000000000000000000000000000000000000000600052601160045260246000fd5b7f4e487b7100000000000000000000000000000000000000000000000000000000600052602260045260246000fd5b600080fd5b7f45524332303a206d696e7420746f20746865207a65726f206164647265737300600082015250565b620006508162000579565b81146200065c57600080fd5b50565b613e97806200066f6000396000f3fe6080604052600436106101dc5760003560e01c80635b2329d4116101025780639865027511610095578063c1cbbca711610064578063c1cbbca71461074b578063dd62ed3e14610767578063e3056a34146107a4578063f2fde38b146107cf57610227565b8063986502751461067d578063a457c2d714610694578063a9059cbb146106d1578063aa271e1a1461070e57610227565b80637b1dab89116100d15780637b1dab89146105af5780637ecebe00146105ec57806395d89b4114610629578063983b2d561461065457610227565b80635b2329d4146104f557806370a082311461053257806379ba50971461056f57806379cc67901461058657610227565b8063278ecde11161017a5780633950935111610149578063395093511461043b57806340c10f191461047857806342966c68146104a1578063497a17f9146104ca57610227565b8063278ecde1146103935780632c0f7b6f146103bc5780633092afd5146103e7578063313ce5671461041057610227565b80630c340a24116101b65780630c340a24146102bd578063141961bc146102e857806318160ddd1461032b57806323b872dd1461035657610227565b806306ec16f81461022c57806306fdde0314610255578063095ea7b31461028057610227565b3661022757343373ffffffffffffffffffffffffffffffffffffffff167faf2a29b830dfbf048c87d6f9222d27f6a1617bef58cbaaea3606097e7407ab8d60405160405180910390a3005b600080fd5b34801561023857600080fd5b50610253600480360381019061024e9190612aaf565b6107f8565b005b34801561026157600080fd5b5061026a6108d0565b604051610277919061311d565b60405180910390f35b34801561028c57600080fd5b506102a760048036038101906102a29190612bf2565b610962565b6040516102b49190613102565b60405180910390f35b3480156102c957600080fd5b506102d2610980565b6040516102df9190613071565b60405180910390f35b3480156102f457600080fd5b5061030f600480360381019061030a9190612c32565b6109a4565b604051610322979695949392919061308c565b60405180910390f35b34801561033757600080fd5b50610340610a9b565b60405161034d919061347f565b60405180910390f35b34801561036257600080fd5b5061037d60048036038101906103789190612b9f565b610aa5565b60405161038a9190613102565b60405180910390f35b34801561039f57600080fd5b506103ba60048036038101906103b59190612c32565b610bc4565b005b3480156103c857600080fd5b506103d1610e81565b6040516103de919061347f565b60405180910390f35b3480156103f357600080fd5b5061040e60048036038101906104099190612a82565b610e87565b005b34801561041c57600080fd5b50610425610f21565b604051610432919061349a565b60405180910390f35b34801561044757600080fd5b50610462600480360381019061045d9190612bf2565b610f2a565b60405161046f9190613102565b60405180910390f35b34801561048457600080fd5b5061049f600480360381019061049a9190612bf2565b610fd6565b005b3480156104ad57600080fd5b506104c860048036038101906104c39190612c32565b611087565b005b3480156104d657600080fd5b506104df61109b565b6040516104ec919061347f565b60405180910390f35b34801561050157600080fd5b5061051c60048036038101906105179190612c32565b6110a1565b6040516105299190613102565b60405180910390f35b34801561053e57600080fd5b5061055960048036038101906105549190612a82565b611134565b604051610566919061347f565b60405180910390f35b34801561057b57600080fd5b5061058461117d565b005b34801561059257600080fd5b506105ad60048036038101906105a89190612bf2565b611453565b005b3480156105bb57600080fd5b506105d660048036038101906105d19190612adc565b6114ce565b6040516105e3919061347f565b60405180910390f35b3480156105f857600080fd5b50610613600480360381019061060e9190612a82565b611743565b604051610620919061347f565b60405180910390f35b34801561063557600080fd5b5061063e61175b565b60405161064b919061311d565b60405180910390f35b34801561066057600080fd5b5061067b60048036038101906106769190612a82565b6117ed565b005b34801561068957600080fd5b50610692611887565b005b3480156106a057600080fd5b506106bb60048036038101906106b69190612bf2565b611892565b6040516106c89190613102565b60405180910390f35b3480156106dd57600080fd5b506106f860048036038101906106f39190612bf2565b61197d565b6040516107059190613102565b60405180910390f35b34801561071a57600080fd5b5061073560048036038101906107309190612a82565b61199b565b6040516107429190613102565b60405180910390f35b61076560048036038101906107609190612c32565b6119f1565b005b34801561077357600080fd5b5061078e60048036038101906107899190612b5f565b611d57565b60405161079b919061347f565b60405180910390f35b3480156107b057600080fd5b506107b9611dde565b6040516107c69190613071565b60405180910390f35b3480156107db57600080fd5b506107f660048036038101906107f19190612a82565b611e04565b005b60008054906101000a900473ffffffffffffffffffffffffffffffffffffffff1673ffffffffffffffffffffffffffffffffffffffff163373ffffffffffffffffffffffffffffffffffffffff1614610886576040517f08c379a000000000000000000000000000000000000000000000000000000000815260040161087d906133bf565b60405180910390fd5b8073ffffffffffffffffffffffffffffffffffffffff166108fc479081150290604051600060405180830381858888f193505050501580156108cc573d6000803e3d6000fd5b5050565b6060600580546108df9061365a565b80601f016020809104026020016040519081016040528092919081815260200182805461090b9061365a565b80156109585780601f1061092d57610100808354040283529160200191610958565b820191906000526020600020905b81548152906001019060200180831161093b57829003601f168201915b5050505050905090565b600061097661096f61202d565b8484612035565b6001905092915050565b60008054906101000a900473ffffffffffffffffffffffffffffffffffffffff1681565b600a6020528060005260406000206000915090508060000160009054906101000a900473ffffffffffffffffffffffffffffffffffffffff16908060010180546109ed9061365a565b80601f0160208091040260200160405190810160405280929190818152602001828054610a199061365a565b8015610a665780601f10610a3b57610100808354040283529160200191610a66565b820191906000526020600020905b815481529060010190602001808311610a4957829003601f168201915b5050505050908060020154908060030154908060040154908060050154908060070160009054906101000a900460ff16905087565b6000600454905090565b600080600360008673ffffffffffffffffffffffffffffffffffffffff1673ffffffffffffffffffffffffffffffffffffffff1681526020019081526020016000206000610af161202d565b73ffffffffffffffffffffffffffffffffffffffff1673ffffffffffffffffffffffffffffffffffffffff1681526020019081526020016000205490507fffffffffffffffffffffffffffffffffffffffffffffffffffffffffffffffff8114610bad5782811015610b98576040517f08c379a0000000000000000000000000000000000000000000000000000000008152600401610b8f906132bf565b60405180910390fd5b610bac85610ba461202d565b858403612035565b5b610bb8858585612200565b60019150509392505050565b6000600a600083815260200190815260200160002090506000816002015411610c22576040517f08c379a0000000000000000000000000000000000000000000000000000000008152600401610c19906133df565b60405180910390fd5b80600301544211610c68576040517f08c379a0000000000000000000000000000000000000000000000000000000008152600401610c5f906133ff565b60405180910390fd5b600015158160070160009054906101000a900460ff16151514610cc0576040517f08c379a0000000000000000000000000000000000000000000000000000000008152600401610cb79061325f565b60405180910390fd5b60008160060160003373ffffffffffffffffffffffffffffffffffffffff1673ffffffffffffffffffffffffffffffffffffffff1681526020019081526020016000205411610d44576040517f08c379a0000000000000000000000000000000000000000000000000000000008152600401610d3b9061329f565b60405180910390fd5b60008160060160003373ffffffffffffffffffffffffffffffffffffffff1673ffffffffffffffffffffffffffffffffffffffff16815260200190815260200160002054905060008260060160003373ffffffffffffffffffffffffffffffffffffffff1673ffffffffffffffffffffffffffffffffffffffff16815260200190815260200160002081905550610de881836005015461248490919063ffffffff16565b82600501819055503373ffffffffffffffffffffffffffffffffffffffff166108fc829081150290604051600060405180830381858888f19350505050158015610e36573d6000803e3d6000fd5b5082813373ffffffffffffffffffffffffffffffffffffffff167f73f04af9dcc582a923ec15d3eea990fe34adabfff2879e28d44572e01a54abb660405160405180910390a4505050565b60095481565b60008054906101000a900473ffffffffffffffffffffffffffffffffffffffff1673ffffffffffffffffffffffffffffffffffffffff163373ffffffffffffffffffffffffffffffffffffffff1614610f15576040517f08c379a0000000000000000000000000000000000000000000000000000000008152600401610f0c906133bf565b60405180910390fd5b610f1e8161249a565b50565b60006012905090565b6000610fcc610f3761202d565b848460036000610f4561202d565b73ffffffffffffffffffffffffffffffffffffffff1673ffffffffffffffffffffffffffffffffffffffff16815260200190815260200160002060008873ffffffffffffffffffffffffffffffffffffffff1673ffffffffffffffffffffffffffffffffffffffff16815260200190815260200160002054610fc79190613527565b612035565b6001905092915050565b610fdf3361199b565b61101e576040517f08c379a0000000000000000000000000000000000000000000000000000000008152600401611015906131df565b60405180910390fd5b6110288282612538565b808273ffffffffffffffffffffffffffffffffffffffff163373ffffffffffffffffffffffffffffffffffffffff167fab8530f87dc9b59234c4623bf917212bb2536d647574c8e7e5da92c2ede0c9f860405160405180910390a45050565b61109861109261202d565b82612699565b50565b600b5481565b600080600a60008481526020019081526020016000209050600115158160070160009054906101000a900460ff16151514156110e157600191505061112f565b8060020154816005015410156110fb57600091505061112f565b42837f85b3ed4e45559c5f41fb220aa4ac86a440dfc741f219089de694242940aaa09c60405160405180910390a360019150505b919050565b6000600260008373ffffffffffffffffffffffffffffffffffffffff1673ffffffffffffffffffffffffffffffffffffffff168152602001908152602001600020549050919050565b600073ffffffffffffffffffffffffffffffffffffffff16600160009054906101000a900473ffffffffffffffffffffffffffffffffffffffff1673ffffffffffffffffffffffffffffffffffffffff16141580156112295750600160009054906101000a900473ffffffffffffffffffffffffffffffffffffffff1673ffffffffffffffffffffffffffffffffffffffff163373ffffffffffffffffffffffffffffffffffffffff16145b611268576040517f08c379a000000000000000000000000000000000000000000000000000000000815260040161125f9061321f565b60405180910390fd5b60008060009054906101000a900473ffffffffffffffffffffffffffffffffffffffff1690506000600160009054906101000a900473ffffffffffffffffffffffffffffffffffffffff169050600160009054906101000a900473ffffffffffffffffffffffffffffffffffffffff166000806101000a81548173ffffffffffffffffffffffffffffffffffffffff021916908373ffffffffffffffffffffffffffffffffffffffff1602179055506000600160006101000a81548173ffffffffffffffffffffffffffffffffffffffff021916908373ffffffffffffffffffffffffffffffffffffffff16021790555060008054906101000a900473ffffffffffffffffffffffffffffffffffffffff1673ffffffffffffffffffffffffffffffffffffffff168273ffffffffffffffffffffffffffffffffffffffff167f0ac6deed30eef60090c749850e10f2fa469e3e25fec1d1bef2853003f6e6f18f60405160405180910390a3600160009054906101000a900473ffffffffffffffffffffffffffffffffffffffff1673ffffffffffffffffffffffffffffffffffffffff168173ffffffffffffffffffffffffffffffffffffffff167f76563ad561b7036ae716b9b25cb521b21463240f104c97e12f25877f2235f33d60405160405180910390a35050565b60006114668361146161202d565b611d57565b9050818110156114ab576040517f08c379a00000000000000000000000000000000000000000000000000000000081526004016114a29061331f565b60405180910390fd5b6114bf836114b761202d565b848403612035565b6114c98383612699565b505050565b60008073ffffffffffffffffffffffffffffffffffffffff168573ffffffffffffffffffffffffffffffffffffffff16141561153f576040517f08c379a00000000000000000000000000000000000000000000000000000000081526004016115369061323f565b60405180910390fd5b60008311611582576040517f08c379a00000000000000000000000000000000000000000000000000000000081526004016115799061327f565b60405180910390fd5b4282116115c4576040517f08c379a00000000000000000000000000000000000000000000000000000000081526004016115bb9061337f565b60405180910390fd5b600b546115da428461248490919063ffffffff16565b1161161a576040517f08c379a00000000000000000000000000000000000000000000000000000000081526004016116119061337f565b60405180910390fd5b60006009600081548092919061162f906136bd565b9190505590506000600a60008381526020019081526020016000209050868160000160006101000a81548173ffffffffffffffffffffffffffffffffffffffff021916908373ffffffffffffffffffffffffffffffffffffffff160217905550858160010190805190602001906116a7929190612930565b5084816002018190555083816003018190555080600301548160000160009054906101000a900473ffffffffffffffffffffffffffffffffffffffff1673ffffffffffffffffffffffffffffffffffffffff16837f3607c7ff6ba5d0178b52df8cc03119d6793c0c3d64051d3c01739067c088abd2846005015460405161172e919061347f565b60405180910390a48192505050949350505050565b60086020528060005260406000206000915090505481565b60606006805461176a9061365a565b80601f01602080910402602001604051908101604052809291908181526020018280546117969061365a565b80156117e35780601f106117b8576101008083540402835291602001916117e3565b820191906000526020600020905b8154815290600101906020018083116117c657829003601f168201915b5050505050905090565b60008054906101000a900473ffffffffffffffffffffffffffffffffffffffff1673ffffffffffffffffffffffffffffffffffffffff163373ffffffffffffffffffffffffffffffffffffffff161461187b576040517f08c379a0000000000000000000000000000000000000000000000000000000008152600401611872906133bf565b60405180910390fd5b61188481612872565b50565b6118903361249a565b565b600080600360006118a161202d565b73ffffffffffffffffffffffffffffffffffffffff1673ffffffffffffffffffffffffffffffffffffffff16815260200190815260200160002060008573ffffffffffffffffffffffffffffffffffffffff1673ffffffffffffffffffffffffffffffffffffffff1681526020019081526020016000205490508281101561195e576040517f08c379a00000000000000000000000000000000000000000000000000000000081526004016119559061343f565b60405180910390fd5b61197261196961202d565b85858403612035565b600191505092915050565b600061199161198a61202d565b8484612200565b6001905092915050565b6000600760008373ffffffffffffffffffffffffffffffffffffffff1673ffffffffffffffffffffffffffffffffffffffff16815260200190815260200160002060009054906101000a900460ff169050919050565b6000600a60008381526020019081526020016000209050600015158160070160009054906101000a900460ff16151514611a60576040517f08c379a0000000000000000000000000000000000000000000000000000000008152600401611a579061341f565b60405180910390fd5b6000816002015411611aa7576040517f08c379a0000000000000000000000000000000000000000000000000000000008152600401611a9e9061315f565b60405180910390fd5b42816003015411611aed576040517f08c379a0000000000000000000000000000000000000000000000000000000008152600401611ae4906132ff565b60405180910390fd5b60003411611b30576040517f08c379a0000000000000000000000000000000000000000000000000000000008152600401611b27906132df565b60405180910390fd5b60008160060160003373ffffffffffffffffffffffffffffffffffffffff1673ffffffffffffffffffffffffffffffffffffffff168152602001908152602001600020541415611b9557806004016000815480929190611b8f906136bd565b91905055505b611be9348260060160003373ffffffffffffffffffffffffffffffffffffffff1673ffffffffffffffffffffffffffffffffffffffff1681526020019081526020016000205461291090919063ffffffff16565b8160060160003373ffffffffffffffffffffffffffffffffffffffff1673ffffffffffffffffffffffffffffffffffffffff16815260200190815260200160002081905550611c4534826005015461291090919063ffffffff16565b816005018190555034823373ffffffffffffffffffffffffffffffffffffffff167f16d99cb06fd9528f88184dd0483174a09cfd8312c28639858734b0c449cc05b860405160405180910390a4611c9c3334612538565b611ca5826110a1565b15611d53576000816005015490506000826005018190555060018260070160006101000a81548160ff0219169083151502179055508160000160009054906101000a900473ffffffffffffffffffffffffffffffffffffffff1673ffffffffffffffffffffffffffffffffffffffff166108fc829081150290604051600060405180830381858888f19350505050158015611d44573d6000803e3d6000fd5b50611d51336103e8612538565b505b5050565b6000600360008473ffffffffffffffffffffffffffffffffffffffff1673ffffffffffffffffffffffffffffffffffffffff16815260200190815260200160002060008373ffffffffffffffffffffffffffffffffffffffff1673ffffffffffffffffffffffffffffffffffffffff16815260200190815260200160002054905092915050565b600160009054906101000a900473ffffffffffffffffffffffffffffffffffffffff1681565b60008054906101000a900473ffffffffffffffffffffffffffffffffffffffff1673ffffffffffffffffffffffffffffffffffffffff163373ffffffffffffffffffffffffffffffffffffffff1614611e92576040517f08c379a0000000000000000000000000000000000000000000000000000000008152600401611e89906133bf565b60405180910390fd5b600073ffffffffffffffffffffffffffffffffffffffff168173ffffffffffffffffffffffffffffffffffffffff161415611f02576040517f08c379a0000000000000000000000000000000000000000000000000000000008152600401611ef99061319f565b60405180910390fd5b6000600160009054906101000a900473ffffffffffffffffffffffffffffffffffffffff16905081600160006101000a81548173ffffffffffffffffffffffffffffffffffffffff021916908373ffffffffffffffffffffffffffffffffffffffff160217905550600160009054906101000a900473ffffffffffffffffffffffffffffffffffffffff1673ffffffffffffffffffffffffffffffffffffffff168173ffffffffffffffffffffffffffffffffffffffff167f76563ad561b7036ae716b9b25cb521b21463240f104c97e12f25877f2235f33d60405160405180910390a35050565b806000806101000a81548173ffffffffffffffffffffffffffffffffffffffff021916908373ffffffffffffffffffffffffffffffffffffffff16021790555050565b600033905090565b600073ffffffffffffffffffffffffffffffffffffffff168373ffffffffffffffffffffffffffffffffffffffff1614156120a5576040517f08c379a000000000000000000000000000000000000000000000000000000000815260040161209c9061339f565b60405180910390fd5b600073ffffffffffffffffffffffffffffffffffffffff168273ffffffffffffffffffffffffffffffffffffffff161415612115576040517f08c379a000000000000000000000000000000000000000000000000000000000815260040161210c906131bf565b60405180910390fd5b80600360008573ffffffffffffffffffffffffffffffffffffffff1673ffffffffffffffffffffffffffffffffffffffff16815260200190815260200160002060008473ffffffffffffffffffffffffffffffffffffffff1673ffffffffffffffffffffffffffffffffffffffff168152602001908152602001600020819055508173ffffffffffffffffffffffffffffffffffffffff168373ffffffffffffffffffffffffffffffffffffffff167f8c5be1e5ebec7d5bd14f71427d1e84f3dd0314c0f7b2291e5b200ac8c7c3b925836040516121f3919061347f565b60405180910390a3505050565b600073ffffffffffffffffffffffffffffffffffffffff168373ffffffffffffffffffffffffffffffffffffffff161415612270576040517f08c379a00000000000000000000000000000000000000000000000000000000081526004016122679061335f565b60405180910390fd5b600073ffffffffffffffffffffffffffffffffffffffff168273ffffffffffffffffffffffffffffffffffffffff1614156122e0576040517f08c379a00000000000000000000000000000000000000000000000000000000081526004016122d79061313f565b60405180910390fd5b6122eb838383612926565b6000600260008573ffffffffffffffffffffffffffffffffffffffff1673ffffffffffffffffffffffffffffffffffffffff16815260200190815260200160002054905081811015612372576040517f08c379a0000000000000000000000000000000000000000000000000000000008152600401612369906131ff565b60405180910390fd5b818103600260008673ffffffffffffffffffffffffffffffffffffffff1673ffffffffffffffffffffffffffffffffffffffff1681526020019081526020016000208190555081600260008573ffffffffffffffffffffffffffffffffffffffff1673ffffffffffffffffffffffffffffffffffffffff16815260200190815260200160002060008282546124079190613527565b925050819055508273ffffffffffffffffffffffffffffffffffffffff168473ffffffffffffffffffffffffffffffffffffffff167fddf252ad1be2c89b69c2b068fc378daa952ba7f163c4a11628f55a4df523b3ef8460405161246b919061347f565b60405180910390a361247e84848461292b565b50505050565b60008183612492919061357d565b905092915050565b6000600760008373ffffffffffffffffffffffffffffffffffffffff1673ffffffffffffffffffffffffffffffffffffffff16815260200190815260200160002060006101000a81548160ff0219169083151502179055508073ffffffffffffffffffffffffffffffffffffffff167fe94479a9f7e1952cc78f2d6baab678adc1b772d936c6583def489e524cb6669260405160405180910390a250565b600073ffffffffffffffffffffffffffffffffffffffff168273ffffffffffffffffffffffffffffffffffffffff1614156125a8576040517f08c379a000000000000000000000000000000000000000000000000000000000815260040161259f9061345f565b60405180910390fd5b6125b460008383612926565b80600460008282546125c69190613527565b9250508190555080600260008473ffffffffffffffffffffffffffffffffffffffff1673ffffffffffffffffffffffffffffffffffffffff168152602001908152602001600020600082825461261c9190613527565b925050819055508173ffffffffffffffffffffffffffffffffffffffff16600073ffffffffffffffffffffffffffffffffffffffff167fddf252ad1be2c89b69c2b068fc378daa952ba7f163c4a11628f55a4df523b3ef83604051612681919061347f565b60405180910390a36126956000838361292b565b5050565b600073ffffffffffffffffffffffffffffffffffffffff168273ffffffffffffffffffffffffffffffffffffffff161415612709576040517f08c379a00000000000000000000000000000000000000000000000000000000081526004016127009061333f565b60405180910390fd5b61271582600083612926565b6000600260008473ffffffffffffffffffffffffffffffffffffffff1673ffffffffffffffffffffffffffffffffffffffff1681526020019081526020016000205490508181101561279c576040517f08c379a00000000000000000000000000000000000000000000000000000000081526004016127939061317f565b60405180910390fd5b818103600260008573ffffffffffffffffffffffffffffffffffffffff1673ffffffffffffffffffffffffffffffffffffffff1681526020019081526020016000208190555081600460008282546127f4919061357d565b92505081905550600073ffffffffffffffffffffffffffffffffffffffff168373ffffffffffffffffffffffffffffffffffffffff167fddf252ad1be2c89b69c2b068fc378daa952ba7f163c4a11628f55a4df523b3ef84604051612859919061347f565b60405180910390a361286d8360008461292b565b505050565b6001600760008373ffffffffffffffffffffffffffffffffffffffff1673ffffffffffffffffffffffffffffffffffffffff16815260200190815260200160002060006101000a81548160ff0219169083151502179055508073ffffffffffffffffffffffffffffffffffffffff167f6ae172837ea30b801fbfcdd4108aa1d5bf8ff775444fd70256b44e6bf3dfc3f660405160405180910390a250565b6000818361291e9190613527565b905092915050565b505050565b505050565b82805461293c9061365a565b90600052602060002090601f01602090048101928261295e57600085556129a5565b82601f1061297757805160ff19168380011785556129a5565b828001600101855582156129a5579182015b828111156129a4578251825591602001919060010190612989565b5b5090506129b291906129b6565b5090565b5b808211156129cf5760008160009055506001016129b7565b5090565b60006129e66129e1846134da565b6134b5565b905082815260208101848484011115612a0257612a01613798565b5b612a0d848285613618565b509392505050565b600081359050612a2481613e1c565b92915050565b600081359050612a3981613e33565b92915050565b600082601f830112612a5457612a53613793565b5b8135612a648482602086016129d3565b91505092915050565b600081359050612a7c81613e4a565b92915050565b600060208284031215612a9857612a976137a2565b5b6000612aa684828501612a15565b91505092915050565b600060208284031215612ac557612ac46137a2565b5b6000612ad384828501612a2a565b91505092915050565b60008060008060808587031215612af657612af56137a2565b5b6000612b0487828801612a2a565b945050602085013567ffffffffffffffff811115612b2557612b2461379d565b5b612b3187828801612a3f565b9350506040612b4287828801612a6d565b9250506060612b5387828801612a6d565b91505092959194509250565b60008060408385031215612b7657612b756137a2565b5b6000612b8485828601612a15565b9250506020612b9585828601612a15565b9150509250929050565b600080600060608486031215612bb857612bb76137a2565b5b6000612bc686828701612a15565b9350506020612bd786828701612a15565b9250506040612be886828701612a6d565b9150509250925092565b60008060408385031215612c0957612c086137a2565b5b6000612c1785828601612a15565b9250506020612c2885828601612a6d565b9150509250929050565b600060208284031215612c4857612c476137a2565b5b6000612c5684828501612a6d565b91505092915050565b612c68816135c3565b82525050565b612c77816135b1565b82525050565b612c86816135d5565b82525050565b6000612c978261350b565b612ca18185613516565b9350612cb1818560208601613627565b612cba816137a7565b840191505092915050565b6000612cd2602383613516565b9150612cdd826137b8565b604082019050919050565b6000612cf5601a83613516565b9150612d0082613807565b602082019050919050565b6000612d18602283613516565b9150612d2382613830565b604082019050919050565b6000612d3b601483613516565b9150612d468261387f565b602082019050919050565b6000612d5e602283613516565b9150612d69826138a8565b604082019050919050565b6000612d81601483613516565b9150612d8c826138f7565b602082019050919050565b6000612da4602683613516565b9150612daf82613920565b604082019050919050565b6000612dc7601f83613516565b9150612dd28261396f565b602082019050919050565b6000612dea601583613516565b9150612df582613998565b602082019050919050565b6000612e0d602983613516565b9150612e18826139c1565b604082019050919050565b6000612e30601f83613516565b9150612e3b82613a10565b602082019050919050565b6000612e53603783613516565b9150612e5e82613a39565b604082019050919050565b6000612e76602883613516565b9150612e8182613a88565b604082019050919050565b6000612e99602783613516565b9150612ea482613ad7565b604082019050919050565b6000612ebc602283613516565b9150612ec782613b26565b604082019050919050565b6000612edf602483613516565b9150612eea82613b75565b604082019050919050565b6000612f02602183613516565b9150612f0d82613bc4565b604082019050919050565b6000612f25602583613516565b9150612f3082613c13565b604082019050919050565b6000612f48601683613516565b9150612f5382613c62565b602082019050919050565b6000612f6b602483613516565b9150612f7682613c8b565b604082019050919050565b6000612f8e601683613516565b9150612f9982613cda565b602082019050919050565b6000612fb1601a83613516565b9150612fbc82613d03565b602082019050919050565b6000612fd4601e83613516565b9150612fdf82613d2c565b602082019050919050565b6000612ff7602483613516565b915061300282613d55565b604082019050919050565b600061301a602583613516565b915061302582613da4565b604082019050919050565b600061303d601f83613516565b915061304882613df3565b602082019050919050565b61305c81613601565b82525050565b61306b8161360b565b82525050565b60006020820190506130866000830184612c6e565b92915050565b600060e0820190506130a1600083018a612c5f565b81810360208301526130b38189612c8c565b90506130c26040830188613053565b6130cf6060830187613053565b6130dc6080830186613053565b6130e960a0830185613053565b6130f660c0830184612c7d565b98975050505050505050565b60006020820190506131176000830184612c7d565b92915050565b600060208201905081810360008301526131378184612c8c565b905092915050565b6000602082019050818103600083015261315881612cc5565b9050919050565b6000602082019050818103600083015261317881612ce8565b9050919050565b6000602082019050818103600083015261319881612d0b565b9050919050565b600060208201905081810360008301526131b881612d2e565b9050919050565b600060208201905081810360008301526131d881612d51565b9050919050565b600060208201905081810360008301526131f881612d74565b9050919050565b6000602082019050818103600083015261321881612d97565b9050919050565b6000602082019050818103600083015261323881612dba565b9050919050565b6000602082019050818103600083015261325881612ddd565b9050919050565b6000602082019050818103600083015261327881612e00565b9050919050565b6000602082019050818103600083015261329881612e23565b9050919050565b600060208201905081810360008301526132b881612e46565b9050919050565b600060208201905081810360008301526132d881612e69565b9050919050565b600060208201905081810360008301526132f881612e8c565b9050919050565b6000602082019050818103600083015261331881612eaf565b9050919050565b6000602082019050818103600083015261333881612ed2565b9050919050565b6000602082019050818103600083015261335881612ef5565b9050919050565b6000602082019050818103600083015261337881612f18565b9050919050565b6000602082019050818103600083015261339881612f3b565b9050919050565b600060208201905081810360008301526133b881612f5e565b9050919050565b600060208201905081810360008301526133d881612f81565b9050919050565b600060208201905081810360008301526133f881612fa4565b9050919050565b6000602082019050818103600083015261341881612fc7565b9050919050565b6000602082019050818103600083015261343881612fea565b9050919050565b600060208201905081810360008301526134588161300d565b9050919050565b6000602082019050818103600083015261347881613030565b9050919050565b60006020820190506134946000830184613053565b92915050565b60006020820190506134af6000830184613062565b92915050565b60006134bf6134d0565b90506134cb828261368c565b919050565b6000604051905090565b600067ffffffffffffffff8211156134f5576134f4613764565b5b6134fe826137a7565b9050602081019050919050565b600081519050919050565b600082825260208201905092915050565b600061353282613601565b915061353d83613601565b9250827fffffffffffffffffffffffffffffffffffffffffffffffffffffffffffffffff0382111561357257613571613706565b5b828201905092915050565b600061358882613601565b915061359383613601565b9250828210156135a6576135a5613706565b5b828203905092915050565b60006135bc826135e1565b9050919050565b60006135ce826135e1565b9050919050565b60008115159050919050565b600073ffffffffffffffffffffffffffffffffffffffff82169050919050565b6000819050919050565b600060ff82169050919050565b82818337600083830152505050565b60005b8381101561364557808201518184015260208101905061362a565b83811115613654576000848401525b50505050565b6000600282049050600182168061367257607f821691505b6020821081141561368657613685613735565b5b50919050565b613695826137a7565b810181811067ffffffffffffffff821117156136b4576136b3613764565b5b80604052505050565b60006136c882613601565b91507fffffffffffffffffffffffffffffffffffffffffffffffffffffffffffffffff8214156136fb576136fa613706565b5b600182019050919050565b7f4e487b7100000000000000000000000000000000000000000000000000000000600052601160045260246000fd5b7f4e487b7100000000000000000000000000000000000000000000000000000000600052602260045260246000fd5b7f4e487b7100000000000000000000000000000000000000000000000000000000600052604160045260246000fd5b600080fd5b600080fd5b600080fd5b600080fd5b6000601f19601f8301169050919050565b7f45524332303a207472616e7366657220746f20746865207a65726f206164647260008201527f6573730000000000000000000000000000000000000000000000000000000000602082015250565b7f43616d7061696e674944206973206e6f7420636f727265637421000000000000600082015250565b7f45524332303a206275726e20616d6f756e7420657863656564732062616c616e60008201527f6365000000000000000000000000000000000000000000000000000000000000602082015250565b7f476f7665726e6f72206d75737420626520736574000000000000000000000000600082015250565b7f45524332303a20617070726f766520746f20746865207a65726f20616464726560008201527f7373000000000000000000000000000000000000000000000000000000000000602082015250565b7f4f6e6c79206d696e7465722063616e2063616c6c000000000000000000000000600082015250565b7f45524332303a207472616e7366657220616d6f756e742065786365656473206260008201527f616c616e63650000000000000000000000000000000000000000000000000000602082015250565b7f43616c6c6572206d7573742062652070656e64696e6720676f7665726e6f7200600082015250565b7f5a65726f206164647265737320656e7465726564210000000000000000000000600082015250565b7f43616d706169676e20686173206265656e207375636365737366756c6c79206360008201527f6f6d706c65746564210000000000000000000000000000000000000000000000602082015250565b7f476f616c2068617320746f206265206120706f7369746976652076616c756500600082015250565b7f596f752068617665206265656e20616c726561647920726566756e646564206f60008201527f7220796f7520617265206e6f7420612066756e64657221000000000000000000602082015250565b7f45524332303a207472616e7366657220616d6f756e742065786365656473206160008201527f6c6c6f77616e6365000000000000000000000000000000000000000000000000602082015250565b7f4f666665722076616c75652068617320746f206265206772656174657220746860008201527f616e207a65726f00000000000000000000000000000000000000000000000000602082015250565b7f446561646c696e652068617320616c7265616479206265656e2072656163686560008201527f6421000000000000000000000000000000000000000000000000000000000000602082015250565b7f45524332303a206275726e20616d6f756e74206578636565647320616c6c6f7760008201527f616e636500000000000000000000000000000000000000000000000000000000602082015250565b7f45524332303a206275726e2066726f6d20746865207a65726f2061646472657360008201527f7300000000000000000000000000000000000000000000000000000000000000602082015250565b7f45524332303a207472616e736665722066726f6d20746865207a65726f20616460008201527f6472657373000000000000000000000000000000000000000000000000000000602082015250565b7f53657420612066757475726520646561646c696e652100000000000000000000600082015250565b7f45524332303a20617070726f76652066726f6d20746865207a65726f2061646460008201527f7265737300000000000000000000000000000000000000000000000000000000602082015250565b7f4f6e6c7920476f7665726e6f722063616e2063616c6c00000000000000000000600082015250565b7f43616d706169676e4944206973206e6f7420636f727265637421000000000000600082015250565b7f43616d706169676e206973207374696c6c20696e2070726f6772657373210000600082015250565b7f43616d706169676e20686173206265656e20616c726561647920636f6d706c6560008201527f7465642100000000000000000000000000000000000000000000000000000000602082015250565b7f45524332303a2064656372656173656420616c6c6f77616e63652062656c6f7760008201527f207a65726f000000000000000000000000000000000000000000000000000000602082015250565b7f45524332303a206d696e7420746f20746865207a65726f206164647265737300600082015250565b613e25816135b1565b8114613e3057600080fd5b50565b613e3c816135c3565b8114613e4757600080fd5b50565b613e5381613601565b8114613e5e57600080fd5b5056fea264697066735822122066702f08ba1dc07c96456fc5703af314e9481900c048864e9a6a95316dd9004564736f6c63430008070033"
-
-contract = web3.eth.contract(abi=contractAbi, bytecode=contractBytecode)
+# abi and bytecode compiled by truffle
+contract = web3.eth.contract(abi=get_abi('CrowdFunding'), bytecode=get_bytecode('CrowdFunding'))
 
 construct_txn = contract.constructor(1000, 3600*24).buildTransaction({
     'from': acct.address,
@@ -0,0 +1,251 @@
+from asgiref.sync import sync_to_async
+from channels.db import database_sync_to_async
+from channels.layers import get_channel_layer
+from .backfill import Backfill
+from .buffer import EventBuffer, RecentEvents
+from .checkpoint import START_CHECKPOINT_NAME, load_checkpoint, save_checkpoint
+from .cluster import LeaseLock, ShardQueue, process_shards
+from .contract import contractName, deploymentBlock, get_contract, get_pool
+from .metrics import BUFFER_DEPTH, EVENTS_INGESTED, HEAD_LAG, LEADER
+from .persistence import EventPersister
+from .poller import LogPoller
+from .rpc import AsyncRpcClient
+from collections import Counter
+import asyncio
+import logging
+import redis
+
+'''
+Module polling the crowdfunding contract once per cluster and fanning its events out
+to every connected websocket through a channels group
+'''
+
+logger = logging.getLogger(__name__)
+
+# connect to the nodes
+rpc = AsyncRpcClient(get_pool())
+
+# connect to redis server
+client = redis.StrictRedis(host='localhost', port=6379, db=0)
+buffer = EventBuffer(client)
+recent = RecentEvents(client)
+
+# only the holder of the lease polls the chain, the other nodes backfill queued ranges
+lease = LeaseLock(client)
+shards = ShardQueue(client)
+
+# channels group joined by every websocket client
+EVENTS_GROUP = 'events'
+
+# contract events forwarded to the clients
+EVENT_NAMES = ['NewCampaignCreated', 'NewContribution', 'Refund', 'GoalReached', 'OfferReceived', 'Transfer']
+
+# maximum number of events published in a single group message
+messageSize = 500
+
+# set time to spend before save events in db
+epoch = 5 * 60
+
+# buffered events triggering an early save
+batchSize = 1000
+
+MAX_SAFE_INTEGER = 2 ** 53 - 1
+
+
+def to_message(event):
+    # integers javascript can not represent exactly are sent as strings
+    args = {
+        name: str(value) if isinstance(value, int) and abs(value) > MAX_SAFE_INTEGER else value
+        for name, value in event['args'].items()
+    }
+    return {
+        'eventName': event['event'],
+        'eventArgs': args,
+        'blockNumber': event['blockNumber'],
+        'logIndex': event['logIndex'],
+        'transactionHash': event['transactionHash'],
+    }
+
+
+class EventsIngester:
+    '''
+    Background task listening to the contract events on behalf of all the websocket clients
+
+    Without a persister the events are only published and buffered, and without
+    checkpoints polling starts from the chain head. With a lease, processes compete
+    for it and only its holder polls and persists; a holder that misses a renewal
+    stops within a heartbeat, the events both may publish meanwhile are deduplicated
+    by the consumers and the mongodb ids. Processes waiting for the lease work on
+    the backfill ranges of `shards`.
+    '''
+
+    def __init__(self, rpc, buffer, recent, persister=None, checkpoints=True, lease=None, shards=None):
+        self.rpc = rpc
+        self.buffer = buffer
+        self.recent = recent
+        self.persister = persister
+        self.checkpoints = checkpoints
+        self.lease = lease
+        self.shards = shards
+        self.task = None
+        self.standby = None
+        self.poller = None
+
+    def start(self):
+        # start the polling task only once per process, on the server event loop
+        if self.poller is None:
+            self.poller = LogPoller(self.rpc, get_contract(), contractName, EVENT_NAMES)
+        if self.task is None or self.task.done():
+            self.task = asyncio.ensure_future(self.lead() if self.lease is not None else self.ingest())
+
+    async def stop(self):
+        for task in (self.task, self.standby):
+            if task is not None:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self.task = self.standby = None
+        await self.rpc.close()
+
+    async def ingest(self):
+        if self.persister is not None:
+            self.persister.start()
+        try:
+            await self.run()
+        finally:
+            if self.persister is not None:
+                await self.persister.stop()
+
+    async def lead(self):
+        # ingest while this process holds the lease, backfill queued ranges meanwhile
+        failures = 0
+        try:
+            while True:
+                try:
+                    acquired = await sync_to_async(self.lease.acquire, thread_sensitive=False)()
+                except Exception:
+                    logger.exception('Acquiring the ingester lease failed')
+                    failures += 1
+                    await asyncio.sleep(self.backoff(failures))
+                    continue
+                if not acquired:
+                    failures = 0
+                    self.start_standby()
+                    await asyncio.sleep(self.lease.heartbeat)
+                    continue
+
+                await self.stop_standby()
+                logger.info('Ingester lease acquired')
+                LEADER.set(1)
+                task = asyncio.ensure_future(self.ingest())
+                try:
+                    while not task.done() and await self.renew():
+                        await asyncio.sleep(self.lease.heartbeat)
+                finally:
+                    task.cancel()
+                    result, = await asyncio.gather(task, return_exceptions=True)
+                    LEADER.set(0)
+
+                if isinstance(result, asyncio.CancelledError):
+                    failures = 0
+                    continue
+                # the ingester stopped on its own, another node may take over while this one waits
+                logger.error('Ingesting events failed', exc_info=result if isinstance(result, BaseException) else None)
+                failures += 1
+                await self.release()
+                await asyncio.sleep(self.backoff(failures))
+        finally:
+            await self.stop_standby()
+            await self.release()
+
+    def backoff(self, failures):
+        return min(self.lease.heartbeat * 2 ** (failures - 1), 60)
+
+    async def release(self):
+        try:
+            await sync_to_async(self.lease.release, thread_sensitive=False)()
+        except Exception:
+            logger.exception('Releasing the ingester lease failed')
+
+    async def renew(self):
+        try:
+            if await sync_to_async(self.lease.renew, thread_sensitive=False)():
+                return True
+        except Exception:
+            logger.exception('Renewing the ingester lease failed')
+        logger.warning('Ingester lease lost')
+        return False
+
+    def start_standby(self):
+        if self.shards is not None and (self.standby is None or self.standby.done()):
+            poller = LogPoller(self.rpc, get_contract(), contractName, EVENT_NAMES)
+            self.standby = asyncio.ensure_future(process_shards(self.shards, Backfill(poller)))
+
+    async def stop_standby(self):
+        if self.standby is not None:
+            self.standby.cancel()
+            await asyncio.gather(self.standby, return_exceptions=True)
+            self.standby = None
+
+    async def resume(self):
+        # continue right after the last processed block instead of the chain head
+        checkpoint = await database_sync_to_async(load_checkpoint)()
+        if checkpoint is not None:
+            self.poller.nextBlock = checkpoint + 1
+            return
+
+        # first start, the archive needs to know where the live events begin
+        if deploymentBlock is not None:
+            self.poller.nextBlock = deploymentBlock
+        else:
+            self.poller.nextBlock = int(await self.rpc.request('eth_blockNumber'), 16) + 1
+        await database_sync_to_async(save_checkpoint)(self.poller.nextBlock, START_CHECKPOINT_NAME)
+
+    async def run(self):
+        channelLayer = get_channel_layer()
+        if self.checkpoints:
+            await self.resume()
+        while True:
+            try:
+                events = await self.poller.poll()
+                if events:
+                    await self.handle(channelLayer, events)
+                lastBlock = self.poller.commit()
+                if lastBlock is not None and self.checkpoints:
+                    await database_sync_to_async(save_checkpoint)(lastBlock)
+                if self.poller.lastHead is not None and self.poller.nextBlock is not None:
+                    HEAD_LAG.set(max(self.poller.lastHead - self.poller.nextBlock + 1, 0))
+            except Exception:
+                logger.exception('Polling contract events failed')
+            await asyncio.sleep(self.poller.interval)
+
+    async def handle(self, channelLayer, events):
+        messages = [to_message(event) for event in events]
+        for eventName, count in Counter(event['event'] for event in events).items():
+            EVENTS_INGESTED.inc(count, event=eventName)
+
+        # keep them for the webpages resuming from a cursor, before publishing them so a
+        # webpage joining the group in between finds them in its replay
+        await sync_to_async(self.recent.add, thread_sensitive=False)(messages)
+
+        # send event data to every connected webpage, a few messages per polled range,
+        # the consumers drop the ones they already replayed
+        for start in range(0, len(messages), messageSize):
+            await channelLayer.group_send(EVENTS_GROUP, {
+                'type': 'chain.events',
+                'events': messages[start:start + messageSize],
+            })
+
+        # add events in redis db, they are saved in mongodb by the persister
+        await sync_to_async(self.buffer.add, thread_sensitive=False)(events)
+        if self.persister is not None:
+            self.persister.notify(len(events))
+
+
+# one ingester per process, shared by all the consumers
+ingester = EventsIngester(rpc, buffer, recent, EventPersister(buffer, epoch, batchSize), lease=lease, shards=shards)
+
+# read at scrape time from the buffer the ingester currently writes to
+BUFFER_DEPTH.set_function(lambda: ingester.buffer.backlog())
@@ -0,0 +1,333 @@
+from pathlib import Path
+from .checkpoint import REBUILD_CHECKPOINT_NAME, checkpoint_time
+from .persistence import from_document, get_collection
+import numpy as np
+import os
+import tempfile
+import threading
+import time
+
+'''
+Module indexing the funders of every campaign in numpy columns, rebuilt from the
+stored contribution and refund events
+'''
+
+# snapshot loaded at startup, the events stored after it are read from mongodb
+SNAPSHOT_PATH = Path(__file__).resolve().parent.parent / 'ledger.npz'
+
+# events the ledger is built from
+LEDGER_EVENTS = ['NewCampaignCreated', 'NewContribution', 'Refund', 'GoalReached']
+
+# wei amounts are split in gwei and a remainder so both fit in fixed width integers
+GWEI = 10 ** 9
+MAX_WEI = (2 ** 64) * GWEI
+
+# minimum time between two reads of the new events from mongodb
+SYNC_INTERVAL = 1
+
+# a sync applying that many events, like the first rebuild or a catch-up, is saved at once
+SNAPSHOT_EVENTS = 1000
+
+# maximum time in seconds the applied events stay out of the snapshot
+SNAPSHOT_INTERVAL = 60
+
+
+class Column:
+    '''
+    Numpy array growing by doubling its capacity, values holds the used part
+    '''
+
+    def __init__(self, dtype, capacity=1024, fill=0):
+        self.fill = fill
+        self.data = np.full(capacity, fill, dtype=dtype)
+        self.size = 0
+
+    @classmethod
+    def from_array(cls, array, fill=0):
+        column = cls(array.dtype, max(len(array), 1024), fill)
+        column.data[:len(array)] = array
+        column.size = len(array)
+        return column
+
+    @property
+    def values(self):
+        return self.data[:self.size]
+
+    def append(self, value):
+        if self.size == len(self.data):
+            self.data = np.concatenate([self.data, np.full(len(self.data), self.fill, dtype=self.data.dtype)])
+        self.data[self.size] = value
+        self.size += 1
+        return self.size - 1
+
+
+def to_wei(gwei, wei):
+    return int(gwei) * GWEI + int(wei)
+
+
+def total_wei(gwei, wei):
+    # exact sum of split amounts, numpy sums them without a python loop
+    return int(gwei.sum(dtype=np.uint64)) * GWEI + int(wei.sum(dtype=np.uint64))
+
+
+class FunderLedger:
+    '''
+    One row per (campaign, funder) with the wei contributed and whether it was refunded
+
+    Addresses are interned in a table and rows refer to them by index. The rows of a
+    funder are chained through the next column, starting from its last row, and every
+    campaign keeps the array of its rows. Events older than the last one applied to
+    their campaign are ignored, so the same events can be read twice, and the ledger
+    is built again from all the events after a backfill stored older ones.
+    '''
+
+    def __init__(self, path=SNAPSHOT_PATH):
+        self.path = Path(path)
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.addresses = []
+        self.addressIndex = {}
+        self.campaign = Column(np.uint64)
+        self.funder = Column(np.uint32)
+        self.gwei = Column(np.uint64)
+        self.wei = Column(np.uint32)
+        self.refunded = Column(np.bool_)
+        self.next = Column(np.int64, fill=-1)
+        # last row of each funder, by address index
+        self.funderHead = Column(np.int64, fill=-1)
+        self.campaignRows = {}
+        self.deadlines = {}
+        self.completed = set()
+        # position (block, log index) of the last event applied to each campaign
+        self.positions = {}
+        self.lastBlock = None
+        # time of the backfill rebuild the ledger was built after
+        self.rebuiltAt = None
+        self.loaded = False
+        self.syncedAt = 0
+        self.savedAt = time.monotonic()
+        self.unsaved = 0
+
+    def intern(self, address):
+        index = self.addressIndex.get(address)
+        if index is None:
+            index = len(self.addresses)
+            self.addresses.append(address)
+            self.addressIndex[address] = index
+            self.funderHead.append(-1)
+        return index
+
+    def find_row(self, campaignID, funderIndex):
+        row = self.funderHead.data[funderIndex]
+        while row != -1:
+            if self.campaign.data[row] == campaignID:
+                return row
+            row = self.next.data[row]
+        return None
+
+    def add_row(self, campaignID, funderIndex):
+        row = self.campaign.append(campaignID)
+        self.funder.append(funderIndex)
+        self.gwei.append(0)
+        self.wei.append(0)
+        self.refunded.append(False)
+        self.next.append(self.funderHead.data[funderIndex])
+        self.funderHead.data[funderIndex] = row
+        if campaignID not in self.campaignRows:
+            self.campaignRows[campaignID] = Column(np.int64, capacity=64)
+        self.campaignRows[campaignID].append(row)
+        return row
+
+    def get_row(self, campaignID, address):
+        funderIndex = self.intern(address)
+        row = self.find_row(campaignID, funderIndex)
+        return self.add_row(campaignID, funderIndex) if row is None else row
+
+    def apply(self, events):
+        # events in block order, returns the number of events applied
+        applied = 0
+        for event in events:
+            args = event['args']
+            campaignID = int(args['campaignID'])
+            position = (event['blockNumber'], event['logIndex'])
+            if position <= self.positions.get(campaignID, (-1, -1)):
+                continue
+            self.positions[campaignID] = position
+            self.lastBlock = max(self.lastBlock or 0, event['blockNumber'])
+            applied += 1
+
+            eventName = event['event']
+            if eventName == 'NewCampaignCreated':
+                self.deadlines[campaignID] = int(args['deadline'])
+            elif eventName == 'GoalReached':
+                self.completed.add(campaignID)
+            elif eventName == 'NewContribution':
+                row = self.get_row(campaignID, args['from'])
+                amount = to_wei(self.gwei.data[row], self.wei.data[row]) + int(args['amountFunded'])
+                if amount >= MAX_WEI:
+                    raise OverflowError(f'Contribution of {amount} wei does not fit the ledger')
+                self.gwei.data[row], self.wei.data[row] = divmod(amount, GWEI)
+            elif eventName == 'Refund':
+                # refunds always return the whole contribution of the funder
+                self.refunded.data[self.get_row(campaignID, args['refunded'])] = True
+        self.unsaved += applied
+        return applied
+
+    def top_funders(self, campaignID, limit=10):
+        # funders who contributed the most, with the amount and whether it was refunded
+        with self.lock:
+            if campaignID not in self.campaignRows:
+                return []
+            rows = self.campaignRows[campaignID].values
+            gwei = self.gwei.data[rows]
+            if len(rows) > limit:
+                # only rows reaching the gwei of the limit-th funder need an exact sort
+                threshold = np.partition(gwei, len(rows) - limit)[len(rows) - limit]
+                rows = rows[gwei >= threshold]
+                gwei = self.gwei.data[rows]
+            order = np.lexsort((self.wei.data[rows], gwei))[::-1][:limit]
+            return [self.to_entry(row) for row in rows[order]]
+
+    def funder_count(self, campaignID):
+        # every funder has a single row per campaign, refunded or not
+        with self.lock:
+            rows = self.campaignRows.get(campaignID)
+            return 0 if rows is None else rows.size
+
+    def refundable(self, campaignID, now=None, limit=None):
+        # funders still owed their contribution, once the deadline passed without reaching the goal
+        now = time.time() if now is None else now
+        with self.lock:
+            deadline = self.deadlines.get(campaignID)
+            if deadline is None or now <= deadline or campaignID in self.completed:
+                return []
+            if campaignID not in self.campaignRows:
+                return []
+            rows = self.campaignRows[campaignID].values
+            owed = rows[~self.refunded.data[rows] & ((self.gwei.data[rows] > 0) | (self.wei.data[rows] > 0))]
+            return [self.to_entry(row) for row in owed[:limit]]
+
+    def funder_totals(self, address):
+        # contributions of an address to every campaign and their sums
+        with self.lock:
+            funderIndex = self.addressIndex.get(address)
+            rows = []
+            row = -1 if funderIndex is None else self.funderHead.data[funderIndex]
+            while row != -1:
+                rows.append(row)
+                row = self.next.data[row]
+
+            rows = np.array(rows[::-1], dtype=np.int64)
+            kept = rows[~self.refunded.data[rows]]
+            return {
+                'address': address,
+                'contributed': total_wei(self.gwei.data[rows], self.wei.data[rows]),
+                'balance': total_wei(self.gwei.data[kept], self.wei.data[kept]),
+                'campaigns': [{'campaignID': int(self.campaign.data[row]), **self.to_entry(row)} for row in rows],
+            }
+
+    def to_entry(self, row):
+        contributed = to_wei(self.gwei.data[row], self.wei.data[row])
+        refunded = bool(self.refunded.data[row])
+        return {
+            'address': self.addresses[self.funder.data[row]],
+            'contributed': contributed,
+            'balance': 0 if refunded else contributed,
+            'refunded': refunded,
+        }
+
+    def save(self):
+        # written next to the snapshot and renamed, readers never see a partial file and
+        # every process writes its own temporary file
+        campaignIDs = sorted(self.positions)
+        descriptor, temporary = tempfile.mkstemp(prefix=self.path.name, suffix='.tmp', dir=self.path.parent)
+        try:
+            with os.fdopen(descriptor, 'wb') as output:
+                np.savez(
+                    output,
+                    addresses=np.array(self.addresses, dtype='U42'),
+                    campaign=self.campaign.values, funder=self.funder.values, gwei=self.gwei.values,
+                    wei=self.wei.values, refunded=self.refunded.values, next=self.next.values,
+                    funderHead=self.funderHead.values,
+                    campaignIDs=np.array(campaignIDs, dtype=np.uint64),
+                    positions=np.array([self.positions[c] for c in campaignIDs], dtype=np.int64).reshape(-1, 2),
+                    deadlines=np.array([self.deadlines.get(c, -1) for c in campaignIDs], dtype=np.int64),
+                    completed=np.array([c in self.completed for c in campaignIDs], dtype=np.bool_),
+                    lastBlock=np.array([-1 if self.lastBlock is None else self.lastBlock], dtype=np.int64),
+                    rebuiltAt=np.array([-1 if self.rebuiltAt is None else self.rebuiltAt], dtype=np.float64),
+                )
+            os.replace(temporary, self.path)
+        except Exception:
+            os.remove(temporary)
+            raise
+        self.savedAt = time.monotonic()
+        self.unsaved = 0
+
+    def restore(self):
+        with np.load(self.path) as snapshot:
+            self.addresses = snapshot['addresses'].tolist()
+            self.addressIndex = {address: index for index, address in enumerate(self.addresses)}
+            for name in ('campaign', 'funder', 'gwei', 'wei', 'refunded'):
+                setattr(self, name, Column.from_array(snapshot[name]))
+            self.next = Column.from_array(snapshot['next'], fill=-1)
+            self.funderHead = Column.from_array(snapshot['funderHead'], fill=-1)
+
+            campaignIDs = snapshot['campaignIDs'].tolist()
+            self.positions = {c: tuple(position) for c, position in zip(campaignIDs, snapshot['positions'].tolist())}
+            self.deadlines = {c: d for c, d in zip(campaignIDs, snapshot['deadlines'].tolist()) if d >= 0}
+            self.completed = {c for c, done in zip(campaignIDs, snapshot['completed'].tolist()) if done}
+            lastBlock = int(snapshot['lastBlock'][0])
+            self.lastBlock = None if lastBlock < 0 else lastBlock
+            rebuiltAt = float(snapshot['rebuiltAt'][0]) if 'rebuiltAt' in snapshot.files else -1
+            self.rebuiltAt = None if rebuiltAt < 0 else rebuiltAt
+
+        # rows of each campaign, grouped in a single pass
+        campaigns = self.campaign.values
+        order = np.argsort(campaigns, kind='stable')
+        bounds = np.flatnonzero(np.diff(campaigns[order])) + 1
+        self.campaignRows = {
+            int(campaigns[rows[0]]): Column.from_array(rows) for rows in np.split(order, bounds) if len(rows)
+        }
+
+    def load(self):
+        if self.loaded:
+            return
+        if self.path.exists():
+            self.restore()
+        self.loaded = True
+
+    def sync(self, force=False):
+        # apply the events stored since the last sync, at most once per SYNC_INTERVAL
+        with self.lock:
+            self.load()
+            if not force and time.monotonic() - self.syncedAt < SYNC_INTERVAL:
+                return
+            rebuiltAt = checkpoint_time(REBUILD_CHECKPOINT_NAME)
+            if rebuiltAt != self.rebuiltAt:
+                self.reset()
+                self.loaded = True
+                self.rebuiltAt = rebuiltAt
+            query = {'event': {'$in': LEDGER_EVENTS}}
+            if self.lastBlock is not None:
+                query['blockNumber'] = {'$gte': self.lastBlock}
+            documents = get_collection().find(query, {'event': 1, 'args': 1, 'blockNumber': 1, 'logIndex': 1})
+            applied = self.apply(map(from_document, documents.sort([('blockNumber', 1), ('logIndex', 1)])))
+            self.syncedAt = time.monotonic()
+            if applied >= SNAPSHOT_EVENTS or (self.unsaved and self.syncedAt - self.savedAt >= SNAPSHOT_INTERVAL):
+                self.save()
+
+
+def to_json(entry):
+    # wei amounts do not fit javascript numbers
+    return {name: str(value) if name in ('contributed', 'balance') else value for name, value in entry.items()}
+
+
+# ledger of this process
+ledger = FunderLedger()
+
+
+def get_ledger():
+    ledger.sync()
+    return ledger
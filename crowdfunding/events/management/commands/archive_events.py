@@ -0,0 +1,93 @@
+from asgiref.sync import sync_to_async
+from django.core.management.base import BaseCommand, CommandError
+from events.archive import archive, archive_events, finalized_block, partition_end
+from events.backfill import Backfill
+from events.contract import confirmations, contractName, get_contract
+from events.ingester import EVENT_NAMES, rpc, shards
+from events.poller import LogPoller
+import asyncio
+
+
+class Command(BaseCommand):
+    help = 'Move the finalized CrowdFunding events into the columnar archive, verify it against the chain or sum it'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--confirmations', type=int, default=confirmations)
+        parser.add_argument('--verify', action='store_true', help='compare the archived events with the chain logs')
+        parser.add_argument('--totals', action='store_true',
+                            help='print the wei raised and refunded per campaign in the archived blocks')
+        parser.add_argument('--from-block', type=int, help='first block to verify or sum, defaults to the first archived one')
+        parser.add_argument('--to-block', type=int, help='last block to verify or sum, defaults to the last archived one')
+        parser.add_argument('--chunk-size', type=int, default=2000)
+        parser.add_argument('--workers', type=int, default=4)
+
+    def handle(self, *args, **options):
+        if options['verify']:
+            try:
+                asyncio.run(self.verify(options))
+            except Exception as error:
+                raise CommandError(f'Verification failed: {error}')
+            return
+        if options['totals']:
+            self.totals(options)
+            return
+
+        # shards end in any order, their blocks are complete only once all of them are
+        if shards.remaining():
+            raise CommandError('A distributed backfill is still running, archive once it completed')
+        toBlock = finalized_block(options['confirmations'])
+        toBlock = None if toBlock is None else partition_end(toBlock)
+        if toBlock is None or toBlock < 0 or (archive.archivedBlock is not None and toBlock <= archive.archivedBlock):
+            self.stdout.write('Nothing to archive')
+            return
+        try:
+            count = asyncio.run(self.archive(toBlock, options))
+        except Exception as error:
+            raise CommandError(f'Archiving failed: {error}')
+        self.stdout.write(self.style.SUCCESS(f'Archived {count} events up to block {toBlock}'))
+
+    def totals(self, options):
+        totals = archive.campaign_totals(options['from_block'], options['to_block'])
+        self.stdout.write('campaignID,raised,refunded,contributions')
+        for campaignID, record in sorted(totals.items()):
+            self.stdout.write(f"{campaignID},{record['raised']},{record['refunded']},{record['contributions']}")
+
+    def backfill(self, options):
+        # the archive and the verification read the logs from the chain the same way
+        return Backfill(
+            LogPoller(rpc, get_contract(), contractName, EVENT_NAMES), options['chunk_size'], options['workers']
+        )
+
+    async def archive(self, toBlock, options):
+        try:
+            return await archive_events(archive, self.backfill(options), toBlock)
+        finally:
+            await rpc.close()
+
+    async def verify(self, options):
+        segments = await sync_to_async(archive.segments)()
+        if not segments:
+            self.stdout.write('The archive is empty')
+            return
+        fromBlock = options['from_block'] if options['from_block'] is not None else segments[0]['minBlock']
+        toBlock = options['to_block'] if options['to_block'] is not None else archive.archivedBlock
+
+        chain = set()
+
+        async def collect(events, lastBlock):
+            chain.update((event['blockNumber'], event['logIndex']) for event in events)
+
+        try:
+            await self.backfill(options).run(fromBlock, toBlock, collect)
+        finally:
+            await rpc.close()
+
+        archived = await sync_to_async(archive.positions)(fromBlock, toBlock)
+        missing = sorted(chain - archived)
+        unexpected = sorted(archived - chain)
+        for label, positions in (('Missing', missing), ('Unexpected', unexpected)):
+            for blockNumber, logIndex in positions[:20]:
+                self.stdout.write(f'{label} event at block {blockNumber}, log {logIndex}')
+        if missing or unexpected:
+            raise CommandError(f'{len(missing)} events missing and {len(unexpected)} unexpected in blocks {fromBlock}-{toBlock}')
+        self.stdout.write(self.style.SUCCESS(f'{len(archived)} archived events match the chain in blocks {fromBlock}-{toBlock}'))
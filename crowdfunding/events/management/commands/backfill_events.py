@@ -0,0 +1,102 @@
+from asgiref.sync import sync_to_async
+from channels.db import database_sync_to_async
+from django.core.management.base import BaseCommand, CommandError
+from events.backfill import Backfill, find_deployment_block
+from events.checkpoint import BACKFILL_CHECKPOINT_NAME, REBUILD_CHECKPOINT_NAME, advance_checkpoint, load_checkpoint, save_checkpoint
+from events.cluster import process_shards
+from events.contract import contractName, deploymentBlock, get_contract
+from events.ingester import EVENT_NAMES, rpc, shards
+from events.persistence import persist_in_worker, rebuild_projection
+from events.poller import LogPoller
+import asyncio
+
+
+class Command(BaseCommand):
+    help = 'Scan the CrowdFunding events emitted before the live ingester started, resuming from the backfill checkpoint'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--from-block', type=int, help='first block to scan, overrides the backfill checkpoint')
+        parser.add_argument('--to-block', type=int, help='last block to scan, defaults to the live checkpoint or the chain head')
+        parser.add_argument('--chunk-size', type=int, default=2000)
+        parser.add_argument('--workers', type=int, default=4)
+        parser.add_argument('--distributed', action='store_true',
+                            help='split the range in shards backfilled by this command and the standby nodes')
+        parser.add_argument('--shard-size', type=int, default=50000)
+
+    def handle(self, *args, **options):
+        try:
+            asyncio.run(self.backfill(options))
+        except Exception as error:
+            raise CommandError(f'Backfill failed: {error}')
+
+    async def backfill(self, options):
+        try:
+            head = int(await rpc.request('eth_blockNumber'), 16)
+
+            # the live ingester covers everything after its own checkpoint
+            toBlock = options['to_block']
+            if toBlock is None:
+                liveCheckpoint = await database_sync_to_async(load_checkpoint)()
+                toBlock = liveCheckpoint if liveCheckpoint is not None else head
+
+            fromBlock = options['from_block']
+            if fromBlock is None:
+                checkpoint = await database_sync_to_async(load_checkpoint)(BACKFILL_CHECKPOINT_NAME)
+                if checkpoint is not None:
+                    fromBlock = checkpoint + 1
+                elif deploymentBlock is not None:
+                    fromBlock = deploymentBlock
+                else:
+                    fromBlock = await find_deployment_block(rpc, get_contract().address, head)
+
+            if fromBlock > toBlock:
+                # a run stopped before rebuilding the campaigns still has to do it
+                self.stdout.write('Nothing to backfill')
+                await self.rebuild(force=False)
+                return
+
+            self.stdout.write(f'Backfilling blocks {fromBlock}-{toBlock}')
+            backfill = Backfill(
+                LogPoller(rpc, get_contract(), contractName, EVENT_NAMES), options['chunk_size'], options['workers']
+            )
+            if options['distributed']:
+                await self.distribute(backfill, fromBlock, toBlock, options['shard_size'])
+            else:
+                await backfill.run(fromBlock, toBlock, self.store)
+            await self.rebuild(force=True)
+            self.stdout.write(self.style.SUCCESS(f'Backfill completed up to block {toBlock}'))
+        finally:
+            await rpc.close()
+
+    async def distribute(self, backfill, fromBlock, toBlock, shardSize):
+        # queue the shards, work on them like the standby nodes and wait for all of them
+        count = await sync_to_async(shards.submit, thread_sensitive=False)(fromBlock, toBlock, shardSize)
+        self.stdout.write(f'Queued {count} shards of {shardSize} blocks')
+        worker = asyncio.ensure_future(process_shards(shards, backfill, idle=1))
+        try:
+            while True:
+                await sync_to_async(shards.requeue_expired, thread_sensitive=False)()
+                remaining = await sync_to_async(shards.remaining, thread_sensitive=False)()
+                if not remaining:
+                    break
+                self.stdout.write(f'{remaining} shards left')
+                await asyncio.sleep(10)
+        finally:
+            worker.cancel()
+            await asyncio.gather(worker, return_exceptions=True)
+        await database_sync_to_async(advance_checkpoint)(toBlock, BACKFILL_CHECKPOINT_NAME)
+
+    async def rebuild(self, force):
+        # the backfilled events are older than the ones the projection and the ledgers applied
+        backfilled = await database_sync_to_async(load_checkpoint)(BACKFILL_CHECKPOINT_NAME)
+        rebuilt = await database_sync_to_async(load_checkpoint)(REBUILD_CHECKPOINT_NAME)
+        if not force and (backfilled is None or (rebuilt is not None and rebuilt >= backfilled)):
+            return
+        count = await database_sync_to_async(rebuild_projection)()
+        await database_sync_to_async(save_checkpoint)(backfilled or 0, REBUILD_CHECKPOINT_NAME)
+        self.stdout.write(f'Rebuilt {count} campaigns')
+
+    async def store(self, events, lastBlock):
+        # historical events go straight to mongodb, the insert ignores the ones already stored
+        await sync_to_async(persist_in_worker, thread_sensitive=False)(events, project=False)
+        await database_sync_to_async(advance_checkpoint)(lastBlock, BACKFILL_CHECKPOINT_NAME)
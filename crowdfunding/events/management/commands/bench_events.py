@@ -0,0 +1,63 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+import asyncio
+import json
+import redis
+
+
+class Command(BaseCommand):
+    help = 'Measure the event pipeline throughput and latency against an in-process test chain'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--clients', type=int, default=50, help='simulated websocket clients')
+        parser.add_argument('--campaigns', type=int, default=20)
+        parser.add_argument('--contributions', type=int, default=500)
+        parser.add_argument('--rate', type=float, default=50.0, help='transactions sent per second')
+        parser.add_argument('--poll-interval', type=float, default=0.05)
+        parser.add_argument('--timeout', type=float, default=30.0, help='seconds to wait for missing events')
+        parser.add_argument('--redis-url', help='use this redis server instead of fakeredis')
+        parser.add_argument('--json', action='store_true', help='print the results as JSON')
+
+    def get_redis(self, url):
+        if url:
+            return redis.StrictRedis.from_url(url)
+        try:
+            import fakeredis
+        except ImportError:
+            raise CommandError('Install fakeredis or pass --redis-url to run the benchmark')
+        return fakeredis.FakeStrictRedis()
+
+    def handle(self, *args, **options):
+        try:
+            from events.bench import Benchmark
+            import eth_tester  # noqa: F401
+        except ImportError as error:
+            raise CommandError(f'The benchmark needs eth-tester and py-evm ({error})')
+
+        benchmark = Benchmark(
+            self.get_redis(options['redis_url']), options['clients'], options['campaigns'],
+            options['contributions'], options['rate'], options['poll_interval'], options['timeout'],
+        )
+        # sockets and ingester share a local channel layer, large enough not to drop messages
+        layers = {'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer', 'CONFIG': {'capacity': 100000}}}
+        with override_settings(CHANNEL_LAYERS=layers):
+            results = asyncio.run(benchmark.run())
+
+        if options['json']:
+            self.stdout.write(json.dumps(results, indent=4))
+            return
+
+        self.stdout.write(f"Clients: {results['clients']}")
+        self.stdout.write(f"Events: {results['events']} sent, {results['delivered']} delivered to every client")
+        self.stdout.write(f"Throughput: {self.format(results['throughput'], '{:.1f} events/s')}")
+        self.stdout.write(
+            f"Chain to socket latency: p50 {self.format(results['latencyP50'], '{:.3f} s')}, "
+            f"p99 {self.format(results['latencyP99'], '{:.3f} s')}"
+        )
+        self.stdout.write(
+            f"RPC calls per event: {self.format(results['rpcCallsPerEvent'], '{:.3f}')} {results['rpcCalls']}"
+        )
+        self.stdout.write(f"Memory per connection: {results['memoryPerConnection'] / 1024:.1f} KiB")
+
+    def format(self, value, template):
+        return template.format(value) if value is not None else 'n/a'
@@ -0,0 +1,95 @@
+from django.core.management.base import BaseCommand, CommandError
+from eth_account import Account
+from events.contract import contractAddress, contractName, get_pool
+from events.rpc import AsyncRpcClient
+from events.transactions import TransactionPipeline
+from pathlib import Path
+from web3 import Web3
+import asyncio
+import csv
+import json
+import os
+import time
+
+
+def parse_deadline(value):
+    # deadlines starting with '+' are relative to now, in seconds
+    value = str(value)
+    return int(time.time()) + int(value[1:]) if value.startswith('+') else int(value)
+
+
+def to_call(row, accounts, index):
+    method = row['method']
+    account = accounts[int(row['account']) if row.get('account') not in (None, '') else index % len(accounts)]
+    if method == 'newCampaign':
+        beneficiary = row.get('beneficiary') or account.address
+        args = (Web3.toChecksumAddress(beneficiary), row['description'], int(row['goal']),
+                parse_deadline(row['deadline']))
+    elif method == 'contribute':
+        args = (int(row['campaignID']),)
+    else:
+        raise CommandError(f'Unsupported method {method} in row {index + 1}')
+    return {'method': method, 'args': args, 'account': account, 'value': int(row.get('value') or 0)}
+
+
+class Command(BaseCommand):
+    help = 'Send the newCampaign and contribute calls listed in a CSV or JSON file concurrently'
+
+    def add_arguments(self, parser):
+        parser.add_argument('spec', help='CSV or JSON file, one row per call with method, account, beneficiary, '
+                                         'description, goal, deadline, campaignID and value')
+        parser.add_argument('--keys', help='file with one private key per line, defaults to $SEED_PRIVATE_KEYS')
+        parser.add_argument('--batch-size', type=int, default=100)
+        parser.add_argument('--max-pending', type=int, default=500)
+        parser.add_argument('--gas-price', type=int, help='gas price in gwei, defaults to the node price')
+        parser.add_argument('--output', help='CSV file receiving the result of every call')
+
+    def load_keys(self, path):
+        if path:
+            keys = Path(path).read_text().split()
+        else:
+            keys = os.environ.get('SEED_PRIVATE_KEYS', '').split(',')
+        keys = [key.strip() for key in keys if key.strip()]
+        if not keys:
+            raise CommandError('No private key given')
+        return [Account.from_key(key) for key in keys]
+
+    def load_rows(self, path):
+        path = Path(path)
+        with open(path, newline='') as spec:
+            if path.suffix == '.json':
+                return json.load(spec)
+            return list(csv.DictReader(spec))
+
+    def handle(self, *args, **options):
+        accounts = self.load_keys(options['keys'])
+        calls = [to_call(row, accounts, index) for index, row in enumerate(self.load_rows(options['spec']))]
+        gasPrice = Web3.toWei(options['gas_price'], 'gwei') if options['gas_price'] else None
+
+        started = time.monotonic()
+        results = asyncio.run(self.submit(calls, gasPrice, options))
+        elapsed = time.monotonic() - started
+
+        succeeded = sum(1 for result in results if result.get('status') == 1)
+        reverted = sum(1 for result in results if result.get('status') == 0)
+        failed = len(results) - succeeded - reverted
+        self.stdout.write(f'{len(results)} calls in {elapsed:.1f} s: {succeeded} succeeded, '
+                          f'{reverted} reverted, {failed} failed')
+
+        if options['output']:
+            fields = ['method', 'transactionHash', 'status', 'blockNumber', 'gasUsed', 'error']
+            with open(options['output'], 'w', newline='') as output:
+                writer = csv.DictWriter(output, fieldnames=fields)
+                writer.writeheader()
+                for call, result in zip(calls, results):
+                    writer.writerow({'method': call['method'], **result})
+
+    async def submit(self, calls, gasPrice, options):
+        rpc = AsyncRpcClient(get_pool())
+        try:
+            pipeline = TransactionPipeline(
+                rpc, contractName, contractAddress, gasPrice, options['batch_size'], options['max_pending'],
+            )
+            return await pipeline.submit(calls)
+        finally:
+            await rpc.close()
@@ -0,0 +1,171 @@
+from contextlib import contextmanager
+import logging
+import math
+import threading
+import time
+
+'''
+Module collecting the event pipeline metrics and rendering them in the prometheus text format
+
+Metrics live in the memory of each process, so every worker exposes its own values.
+'''
+
+logger = logging.getLogger(__name__)
+
+# every metric created, in rendering order
+REGISTRY = []
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, math.inf)
+
+
+def escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def format_value(value):
+    if value == math.inf:
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    '''
+    Base class of the metrics, values are stored per tuple of label values
+    '''
+
+    type = None
+
+    def __init__(self, name, documentation, labelNames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelNames = tuple(labelNames)
+        self.values = {}
+        self.lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def key(self, labels):
+        return tuple(str(labels[labelName]) for labelName in self.labelNames)
+
+    def format_labels(self, key, extra=()):
+        pairs = list(zip(self.labelNames, key)) + list(extra)
+        if not pairs:
+            return ''
+        return '{' + ','.join(f'{name}="{escape(value)}"' for name, value in pairs) + '}'
+
+    def samples(self):
+        with self.lock:
+            return [(self.name + self.format_labels(key), value) for key, value in self.values.items()]
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.type}']
+        lines += [f'{sample} {format_value(value)}' for sample, value in self.samples()]
+        return '\n'.join(lines)
+
+
+class Counter(Metric):
+    type = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self.key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+
+class Gauge(Metric):
+    '''
+    Gauge set by the code, or computed at scrape time by `function` when it has no labels
+    '''
+
+    type = 'gauge'
+
+    def __init__(self, name, documentation, labelNames=(), function=None):
+        super().__init__(name, documentation, labelNames)
+        self.function = function
+
+    def set_function(self, function):
+        self.function = function
+
+    def set(self, value, **labels):
+        with self.lock:
+            self.values[self.key(labels)] = value
+
+    def inc(self, amount=1, **labels):
+        key = self.key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def samples(self):
+        if self.function is None:
+            return super().samples()
+        try:
+            return [(self.name, self.function())]
+        except Exception:
+            logger.exception('Reading metric %s failed', self.name)
+            return []
+
+
+class Histogram(Metric):
+    type = 'histogram'
+
+    def __init__(self, name, documentation, labelNames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelNames)
+        self.buckets = tuple(buckets) if buckets[-1] == math.inf else tuple(buckets) + (math.inf,)
+
+    def observe(self, value, **labels):
+        key = self.key(labels)
+        with self.lock:
+            counts, total = self.values.get(key, ([0] * len(self.buckets), 0))
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[index] += 1
+                    break
+            self.values[key] = (counts, total + value)
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def samples(self):
+        samples = []
+        with self.lock:
+            for key, (counts, total) in self.values.items():
+                cumulative = 0
+                for bound, count in zip(self.buckets, counts):
+                    cumulative += count
+                    labels = self.format_labels(key, [('le', format_value(bound))])
+                    samples.append((f'{self.name}_bucket{labels}', cumulative))
+                samples.append((f'{self.name}_sum{self.format_labels(key)}', total))
+                samples.append((f'{self.name}_count{self.format_labels(key)}', cumulative))
+        return samples
+
+
+def render():
+    return '\n'.join(metric.render() for metric in REGISTRY) + '\n'
+
+
+# -- Ingestion --
+RPC_LATENCY = Histogram('crowdfunding_rpc_request_seconds', 'Latency of the JSON-RPC requests', ['method'])
+EVENTS_INGESTED = Counter('crowdfunding_events_ingested_total', 'Contract events ingested', ['event'])
+HEAD_LAG = Gauge('crowdfunding_chain_head_lag_blocks', 'Blocks between the chain head and the last processed one')
+BUFFER_DEPTH = Gauge('crowdfunding_buffer_depth', 'Events in the redis stream waiting to be persisted')
+LEADER = Gauge('crowdfunding_ingester_leader', 'Whether this process holds the ingester lease')
+FLUSH_LATENCY = Histogram('crowdfunding_flush_seconds', 'Duration of the mongodb writes of a batch of events')
+FLUSH_SIZE = Histogram(
+    'crowdfunding_flush_batch_size', 'Events written to mongodb per batch', buckets=(1, 10, 100, 500, 1000, 5000)
+)
+
+# -- Delivery --
+CONNECTIONS = Gauge('crowdfunding_websocket_connections', 'Open websocket connections')
+SEND_QUEUE_DEPTH = Histogram(
+    'crowdfunding_websocket_send_queue_depth', 'Events queued for a socket when its frame is sent',
+    buckets=(1, 10, 50, 100, 500, 1000),
+)
+FRAMES_SENT = Counter('crowdfunding_websocket_frames_total', 'Frames sent to the websockets')
+EVENTS_DROPPED = Counter('crowdfunding_websocket_dropped_events_total', 'Events dropped for slow websocket clients')
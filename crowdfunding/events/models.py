@@ -5,3 +5,10 @@ class Event(models.Model):
     type = models.CharField(max_length=50)
     times = models.IntegerField(default=1)
     timestamp = models.DateTimeField(auto_now_add=True)
+
+
+class Checkpoint(models.Model):
+    _id = models.ObjectIdField()
+    name = models.CharField(max_length=50, unique=True)
+    block = models.IntegerField()
+    timestamp = models.DateTimeField(auto_now=True)
@@ -0,0 +1,17 @@
+from django.conf import settings
+from functools import lru_cache
+from pymongo import MongoClient
+
+'''
+Module giving direct pymongo access to the project database for bulk operations
+'''
+
+DUPLICATE_KEY_ERROR = 11000
+
+
+@lru_cache(maxsize=None)
+def get_database():
+    # same database used by djongo for the models
+    config = settings.DATABASES['default']
+    client = MongoClient(**config.get('CLIENT', {}))
+    return client[config['NAME']]
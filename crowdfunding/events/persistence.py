@@ -0,0 +1,213 @@
+from asgiref.sync import sync_to_async
+from bson.decimal128 import Decimal128
+from collections import Counter
+from django.db import close_old_connections
+from pymongo import ASCENDING
+from pymongo.errors import BulkWriteError
+from .metrics import FLUSH_LATENCY, FLUSH_SIZE
+from .models import Event
+from .mongo import DUPLICATE_KEY_ERROR, get_database
+from .projections import PROJECTED_EVENTS, projection
+from .rollups import apply_rollups, event_timestamps
+import asyncio
+import logging
+
+'''
+Module persisting the buffered events to mongodb in bulk
+'''
+
+logger = logging.getLogger(__name__)
+
+# collection holding one document per contract event
+EVENTS_COLLECTION = 'chain_events'
+
+# largest integer a Decimal128 holds exactly
+MAX_DECIMAL = 10 ** 34 - 1
+
+indexesReady = False
+
+
+def get_collection():
+    global indexesReady
+    collection = get_database()[EVENTS_COLLECTION]
+    if not indexesReady:
+        collection.create_index([('blockNumber', ASCENDING), ('logIndex', ASCENDING)])
+        collection.create_index([('event', ASCENDING), ('blockNumber', ASCENDING)])
+        indexesReady = True
+    return collection
+
+
+def event_id(event):
+    # the id makes inserting the same log twice a no-op
+    return f"{event['transactionHash']}:{event['logIndex']}"
+
+
+def to_decimal(value):
+    if value > MAX_DECIMAL:
+        raise OverflowError(f'{value} does not fit a Decimal128')
+    return Decimal128(str(value))
+
+
+def to_document(event):
+    # every uint256 argument is a Decimal128, mongodb integers are only 64 bit wide and
+    # decimals keep their order in queries and sorts and add up in $sum like the rollups
+    args = {
+        name: to_decimal(value) if isinstance(value, int) and not isinstance(value, bool) else value
+        for name, value in event['args'].items()
+    }
+    return {
+        '_id': event_id(event),
+        'event': event['event'],
+        'blockNumber': event['blockNumber'],
+        'blockHash': event['blockHash'],
+        'transactionHash': event['transactionHash'],
+        'transactionIndex': event['transactionIndex'],
+        'logIndex': event['logIndex'],
+        'address': event['address'],
+        'args': args,
+        # set once the event is counted in the aggregates
+        'rolledUp': False,
+    }
+
+
+def from_document(document):
+    # stored event with its uint256 arguments back to python integers
+    args = {
+        name: int(value.to_decimal()) if isinstance(value, Decimal128) else value
+        for name, value in document['args'].items()
+    }
+    return {**document, 'args': args}
+
+
+def store_events(events):
+    # unordered bulk insert, returns the events which were not stored yet
+    if not events:
+        return []
+    try:
+        get_collection().insert_many([to_document(event) for event in events], ordered=False)
+        return events
+    except BulkWriteError as error:
+        errors = error.details['writeErrors']
+        if any(writeError['code'] != DUPLICATE_KEY_ERROR for writeError in errors):
+            raise
+        duplicates = {writeError['index'] for writeError in errors}
+        return [event for index, event in enumerate(events) if index not in duplicates]
+
+
+def pending_rollups(events):
+    # stored events not counted yet, inserted now or by an earlier flush that failed halfway
+    query = {'_id': {'$in': [event_id(event) for event in events]}, 'rolledUp': False}
+    pending = {document['_id'] for document in get_collection().find(query, {'_id': 1})}
+    return [event for event in events if event_id(event) in pending]
+
+
+def persist_events(events, project=True):
+    # read from the node before writing anything, a provider failure leaves the batch to the next flush
+    timestamps = event_timestamps(events)
+    stored = store_events(events)
+
+    # counts and time bucketed aggregates of the events not counted yet, then flag them
+    pending = pending_rollups(events)
+    if pending:
+        counts = Counter(event['event'] for event in pending)
+        Event.objects.bulk_create([Event(type=eventName, times=times) for eventName, times in counts.items()])
+        apply_rollups(pending, timestamps)
+        ids = [event_id(event) for event in pending]
+        get_collection().update_many({'_id': {'$in': ids}}, {'$set': {'rolledUp': True}})
+
+    # the projection skips the events older than the ones it applied, so backfilled
+    # ranges are stored without it and added by rebuild_projection
+    if project:
+        projection.apply(events)
+    return stored
+
+
+def persist_in_worker(events, project=True):
+    # persist_events for the threads of sync_to_async(thread_sensitive=False), which
+    # do not close their database connections like database_sync_to_async does
+    close_old_connections()
+    try:
+        return persist_events(events, project)
+    finally:
+        close_old_connections()
+
+
+def rebuild_projection():
+    # campaign records computed again from all the stored events, returns their number
+    def find_events(fromBlock):
+        query = {'event': {'$in': PROJECTED_EVENTS}, 'blockNumber': {'$gte': fromBlock}}
+        documents = get_collection().find(query, {'event': 1, 'args': 1, 'blockNumber': 1, 'logIndex': 1})
+        return map(from_document, documents.sort([('blockNumber', ASCENDING), ('logIndex', ASCENDING)]))
+
+    return projection.rebuild(find_events)
+
+
+class EventPersister:
+    '''
+    Background task moving the buffered events to mongodb
+
+    A flush happens every `interval` seconds, or as soon as `batchSize` events have been
+    buffered, and costs one bulk write per batch.
+    '''
+
+    def __init__(self, buffer, interval=5 * 60, batchSize=1000):
+        self.buffer = buffer
+        self.interval = interval
+        self.batchSize = batchSize
+        self.pending = 0
+        self.wakeup = None
+        self.task = None
+
+    def start(self):
+        if self.task is None or self.task.done():
+            self.wakeup = asyncio.Event()
+            self.task = asyncio.ensure_future(self.run())
+
+    async def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+
+    def notify(self, count):
+        # called for every buffered batch, wakes the task up once the threshold is reached
+        self.pending += count
+        if self.pending >= self.batchSize and self.wakeup is not None:
+            self.wakeup.set()
+
+    async def run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self.wakeup.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self.wakeup.clear()
+            self.pending = 0
+
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception('Saving events failed')
+
+    async def flush(self):
+        # every batch runs in a thread of its own, the single thread running the thread
+        # sensitive calls also handles the websocket handshakes and the checkpoints
+        batches = self.buffer.read(self.batchSize)
+        while await sync_to_async(self.flush_batch, thread_sensitive=False)(batches):
+            pass
+
+    def flush_batch(self, batches):
+        # stores the next batch, returns False once the buffer is empty
+        entries = next(batches, None)
+        if entries is None:
+            return False
+        with FLUSH_LATENCY.time():
+            stored = persist_in_worker([event for _, event in entries])
+        FLUSH_SIZE.observe(len(entries))
+        # remove data from the pending list only once it is stored
+        self.buffer.ack([entryId for entryId, _ in entries])
+        logger.info('Saved %d events', len(stored))
+        return True
@@ -0,0 +1,114 @@
+from hexbytes import HexBytes
+from web3 import Web3
+from web3.datastructures import AttributeDict
+from .registry import get_event_topics
+import json
+import time
+
+'''
+Module polling all the contract events with a single eth_getLogs call per block range
+'''
+
+
+def format_log(log):
+    # convert a raw json-rpc log to the types expected by the web3 decoders
+    return AttributeDict({
+        **log,
+        'topics': [HexBytes(topic) for topic in log['topics']],
+        'transactionHash': HexBytes(log['transactionHash']),
+        'blockHash': HexBytes(log['blockHash']),
+        'blockNumber': int(log['blockNumber'], 16),
+        'logIndex': int(log['logIndex'], 16),
+        'transactionIndex': int(log['transactionIndex'], 16),
+    })
+
+
+class LogPoller:
+    '''
+    Fetches the logs of every new block range in one request and decodes them locally
+
+    The poll interval follows the observed block time, so a new block is usually
+    picked up on the first tick after it was mined.
+    '''
+
+    def __init__(self, rpc, contract, contractName, eventNames, confirmations=0, maxRange=2000,
+                 blockTime=12, minInterval=1, maxInterval=30):
+        self.rpc = rpc
+        self.address = contract.address
+        self.confirmations = confirmations
+        self.maxRange = maxRange
+        self.minInterval = minInterval
+        self.maxInterval = maxInterval
+
+        # topic0 -> event decoder lookups
+        self.decoders = {
+            topic: contract.events[name]()
+            for topic, name in get_event_topics(contractName).items() if name in eventNames
+        }
+
+        # first block still to be fetched, None means start from the chain head
+        self.nextBlock = None
+        # last block of the range returned by the latest poll, not committed yet
+        self.toBlock = None
+        self.blockTime = blockTime
+        self.interval = minInterval
+        self.lastHead = None
+        self.lastHeadTime = None
+
+    def decode(self, log):
+        decoder = self.decoders[log['topics'][0]]
+        event = decoder.processLog(format_log(log))
+        return json.loads(Web3.toJSON(event))
+
+    def observe_head(self, head):
+        # estimate the block time with an exponential moving average of the head advances
+        now = time.monotonic()
+        if self.lastHead is not None and head > self.lastHead:
+            sample = (now - self.lastHeadTime) / (head - self.lastHead)
+            self.blockTime = min(max(0.8 * self.blockTime + 0.2 * sample, self.minInterval), self.maxInterval)
+        if self.lastHead is None or head > self.lastHead:
+            self.lastHead = head
+            self.lastHeadTime = now
+
+    async def get_logs(self, fromBlock, toBlock):
+        return await self.rpc.request('eth_getLogs', [{
+            'address': self.address,
+            'fromBlock': hex(fromBlock),
+            'toBlock': hex(toBlock),
+            'topics': [list(self.decoders)],
+        }])
+
+    async def poll(self):
+        # return the events of the next block range, commit() moves past it once they are handled
+        self.toBlock = None
+        head = int(await self.rpc.request('eth_blockNumber'), 16)
+        self.observe_head(head)
+        head -= self.confirmations
+
+        if self.nextBlock is None:
+            self.nextBlock = head + 1
+        if head < self.nextBlock:
+            # no new block yet, check again a bit later
+            self.interval = max(self.minInterval, self.blockTime / 4)
+            return []
+
+        toBlock = min(head, self.nextBlock + self.maxRange - 1)
+        logs = await self.get_logs(self.nextBlock, toBlock)
+        self.toBlock = toBlock
+
+        if toBlock < head:
+            # still catching up, poll again right away
+            self.interval = 0
+        else:
+            # wait until the next block is expected
+            elapsed = time.monotonic() - self.lastHeadTime
+            self.interval = max(self.minInterval, self.blockTime - elapsed)
+
+        return [self.decode(log) for log in logs if not log.get('removed')]
+
+    def commit(self):
+        if self.toBlock is None:
+            return None
+        self.nextBlock = self.toBlock + 1
+        self.toBlock = None
+        return self.nextBlock - 1
@@ -0,0 +1,62 @@
+from collections import Counter
+import sys
+import threading
+
+'''
+Module sampling the stacks of all the threads of the process, switched on at runtime
+'''
+
+
+class SamplingProfiler:
+    '''
+    Records the stack of every thread at a fixed interval and reports them in the
+    collapsed format read by flamegraph tools
+    '''
+
+    def __init__(self, interval=0.01):
+        self.interval = interval
+        self.samples = Counter()
+        self.thread = None
+        self.stopped = threading.Event()
+        self.lock = threading.Lock()
+
+    @property
+    def running(self):
+        return self.thread is not None and self.thread.is_alive()
+
+    def start(self):
+        with self.lock:
+            if self.running:
+                return
+            self.samples.clear()
+            self.stopped.clear()
+            self.thread = threading.Thread(target=self.run, name='sampling-profiler', daemon=True)
+            self.thread.start()
+
+    def stop(self):
+        with self.lock:
+            if self.thread is not None:
+                self.stopped.set()
+                self.thread.join()
+                self.thread = None
+            return self.collapsed()
+
+    def run(self):
+        ownId = threading.get_ident()
+        while not self.stopped.wait(self.interval):
+            for threadId, frame in sys._current_frames().items():
+                if threadId == ownId:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f'{code.co_name} ({code.co_filename}:{frame.f_lineno})')
+                    frame = frame.f_back
+                self.samples[';'.join(reversed(stack))] += 1
+
+    def collapsed(self):
+        return '\n'.join(f'{stack} {count}' for stack, count in self.samples.most_common()) + '\n'
+
+
+# profiler of this process
+profiler = SamplingProfiler()
@@ -0,0 +1,269 @@
+from pymongo import ASCENDING, ReplaceOne
+from pymongo.errors import BulkWriteError
+from .contract import get_reader
+from .mongo import DUPLICATE_KEY_ERROR, get_database
+import itertools
+import logging
+import threading
+import time
+
+'''
+Module keeping a projection of the campaigns state up to date from the contract events
+'''
+
+logger = logging.getLogger(__name__)
+
+# collection holding one document per campaign
+CAMPAIGNS_COLLECTION = 'campaigns'
+
+# events changing the campaign records
+PROJECTED_EVENTS = ['NewCampaignCreated', 'NewContribution', 'Refund', 'GoalReached']
+
+# events applied at once when rebuilding the records
+REBUILD_BATCH = 1000
+
+# default window of the expiring campaigns filter
+EXPIRING_WINDOW = 24 * 60 * 60
+
+indexesReady = False
+
+
+def get_collection():
+    global indexesReady
+    collection = get_database()[CAMPAIGNS_COLLECTION]
+    if not indexesReady:
+        collection.create_index([('completed', ASCENDING), ('deadline', ASCENDING)])
+        indexesReady = True
+    return collection
+
+
+def fetch_campaigns(campaignIDs):
+    # immutable campaign fields that the creation event does not carry
+    details = {}
+    for campaignID, (beneficiary, description, goal, deadline, *_) in get_reader().campaigns(campaignIDs).items():
+        details[campaignID] = {'beneficiary': beneficiary, 'description': description, 'goal': goal, 'deadline': deadline}
+    return details
+
+
+class CampaignState:
+    '''
+    Compact in-memory record of a campaign, wei amounts are stored as strings in mongodb
+
+    Funders are not kept here, the funder ledger counts them.
+    '''
+
+    __slots__ = ('campaignID', 'beneficiary', 'description', 'goal', 'deadline', 'amount', 'raised', 'refunded',
+                 'completed', 'completedAt', 'createdBlock', 'lastLog')
+
+    def __init__(self, campaignID, beneficiary, description, goal, deadline, amount=0, raised=0, refunded=0,
+                 completed=False, completedAt=None, createdBlock=None, lastLog=(0, 0)):
+        self.campaignID = campaignID
+        self.beneficiary = beneficiary
+        self.description = description
+        self.goal = goal
+        self.deadline = deadline
+        self.amount = amount
+        self.raised = raised
+        self.refunded = refunded
+        self.completed = completed
+        self.completedAt = completedAt
+        self.createdBlock = createdBlock
+        # position (block, log index) of the last event applied, older events are ignored
+        self.lastLog = tuple(lastLog)
+
+    @classmethod
+    def from_document(cls, document):
+        return cls(
+            document['_id'], document['beneficiary'], document['description'], int(document['goal']),
+            document['deadline'], int(document['amount']), int(document['raised']), int(document['refunded']),
+            document['completed'], document['completedAt'], document['createdBlock'], document['lastLog'],
+        )
+
+    def to_document(self):
+        return {
+            '_id': self.campaignID,
+            'beneficiary': self.beneficiary,
+            'description': self.description,
+            'goal': str(self.goal),
+            'deadline': self.deadline,
+            'amount': str(self.amount),
+            'raised': str(self.raised),
+            'refunded': str(self.refunded),
+            'completed': self.completed,
+            'completedAt': self.completedAt,
+            'createdBlock': self.createdBlock,
+            'lastLog': list(self.lastLog),
+        }
+
+
+class CampaignProjection:
+    '''
+    Applies batches of events to the campaign records and writes the changed ones back in bulk
+
+    Records are read for every batch and only replaced if no other process changed them
+    in between, otherwise the batch is applied again to the records written meanwhile.
+    Events older than the last one applied to their campaign are ignored, so backfilled
+    ranges are added by rebuilding the records from all the stored events in block order.
+    '''
+
+    def __init__(self, fetch=fetch_campaigns):
+        self.fetch = fetch
+        self.lock = threading.Lock()
+
+    def read(self, campaignIDs):
+        return {
+            document['_id']: CampaignState.from_document(document)
+            for document in get_collection().find({'_id': {'$in': list(campaignIDs)}})
+        }
+
+    def write(self, records, positions):
+        # replaces the records still at the position they were read at, returns the ids of the others
+        if not records:
+            return set()
+        operations = [
+            ReplaceOne(
+                {'_id': record.campaignID, 'lastLog': positions.get(record.campaignID)}, record.to_document(), upsert=True
+            ) for record in records
+        ]
+        try:
+            result = get_collection().bulk_write(operations, ordered=False)
+            if result.matched_count + result.upserted_count == len(operations):
+                return set()
+        except BulkWriteError as error:
+            # the upsert of a record moved meanwhile collides with its id
+            if any(writeError['code'] != DUPLICATE_KEY_ERROR for writeError in error.details['writeErrors']):
+                raise
+
+        query = {'_id': {'$in': [record.campaignID for record in records]}}
+        written = {document['_id']: tuple(document['lastLog']) for document in get_collection().find(query, {'lastLog': 1})}
+        return {record.campaignID for record in records if written.get(record.campaignID) != record.lastLog}
+
+    def apply(self, events):
+        with self.lock:
+            campaignIDs = {event['args']['campaignID'] for event in events if event['event'] in PROJECTED_EVENTS}
+            while campaignIDs:
+                campaigns = self.read(campaignIDs)
+                positions = {campaignID: list(record.lastLog) for campaignID, record in campaigns.items()}
+                changed = self.apply_batch(
+                    campaigns, [event for event in events if event['args'].get('campaignID') in campaignIDs]
+                )
+                campaignIDs = self.write([campaigns[campaignID] for campaignID in changed], positions)
+
+    def rebuild(self, find_events):
+        # `find_events(fromBlock)` returns the stored events from a block on, in block order
+        with self.lock:
+            campaigns = {}
+            fromBlock = 0
+            while True:
+                changed = set()
+                events = find_events(fromBlock)
+                for batch in iter(lambda: list(itertools.islice(events, REBUILD_BATCH)), []):
+                    changed |= self.apply_batch(campaigns, batch)
+
+                # records the live projection moved further hold events stored after they were read
+                positions = {document['_id']: document['lastLog'] for document in get_collection().find({}, {'lastLog': 1})}
+                behind = [
+                    record.lastLog[0] for campaignID, record in campaigns.items()
+                    if tuple(positions.get(campaignID, (-1, -1))) > record.lastLog
+                ]
+                if behind and changed:
+                    fromBlock = min(behind)
+                    continue
+
+                conflicts = self.write(list(campaigns.values()), positions)
+                if not conflicts:
+                    return len(campaigns)
+                fromBlock = min(campaigns[campaignID].lastLog[0] for campaignID in conflicts)
+
+    def apply_batch(self, campaigns, events):
+        # applies the events to the records of `campaigns`, returns the ids of the changed ones
+        newIDs = [
+            event['args']['campaignID'] for event in events
+            if event['event'] == 'NewCampaignCreated' and event['args']['campaignID'] not in campaigns
+        ]
+        details = self.fetch(newIDs) if newIDs else {}
+
+        changed = set()
+        for event in events:
+            record = self.apply_event(campaigns, event, details)
+            if record is not None:
+                changed.add(record.campaignID)
+        return changed
+
+    def apply_event(self, campaigns, event, details):
+        eventName = event['event']
+        args = event['args']
+        position = (event['blockNumber'], event['logIndex'])
+
+        if eventName == 'NewCampaignCreated':
+            campaignID = args['campaignID']
+            if campaignID in campaigns:
+                return None
+            record = CampaignState(campaignID, createdBlock=event['blockNumber'], lastLog=position,
+                                   **details[campaignID])
+            campaigns[campaignID] = record
+            return record
+
+        if eventName not in PROJECTED_EVENTS:
+            return None
+
+        record = campaigns.get(args['campaignID'])
+        if record is None:
+            logger.warning('Event %s for unknown campaign %s', eventName, args['campaignID'])
+            return None
+        if position <= record.lastLog:
+            return None
+        record.lastLog = position
+
+        # events stored before the arguments were decimals hold the big amounts as strings
+        if eventName == 'NewContribution':
+            record.amount += int(args['amountFunded'])
+            record.raised += int(args['amountFunded'])
+        elif eventName == 'Refund':
+            record.amount -= int(args['amount'])
+            record.refunded += int(args['amount'])
+        else:
+            # the collected amount is sent to the beneficiary
+            record.amount = 0
+            record.completed = True
+            record.completedAt = int(args['timestamp'])
+        return record
+
+
+def to_json(document):
+    document = dict(document)
+    document['campaignID'] = document.pop('_id')
+    document.pop('lastLog', None)
+    return document
+
+
+def find_campaigns(status=None, cursor=None, limit=20, within=EXPIRING_WINDOW):
+    # campaigns ordered by id, `cursor` is the last id of the previous page
+    now = int(time.time())
+    if status is None:
+        query = {}
+    elif status == 'active':
+        query = {'completed': False, 'deadline': {'$gt': now}}
+    elif status == 'expiring':
+        query = {'completed': False, 'deadline': {'$gt': now, '$lte': now + within}}
+    elif status == 'completed':
+        query = {'completed': True}
+    else:
+        raise ValueError(f'Unknown status {status}')
+
+    if cursor is not None:
+        query['_id'] = {'$gt': cursor}
+
+    # documents written before the ledger counted the funders hold their list
+    documents = list(get_collection().find(query, {'funders': 0}).sort('_id', ASCENDING).limit(limit + 1))
+    nextCursor = documents[limit - 1]['_id'] if len(documents) > limit else None
+    return [to_json(document) for document in documents[:limit]], nextCursor
+
+
+def get_campaign(campaignID):
+    document = get_collection().find_one({'_id': campaignID}, {'funders': 0})
+    return to_json(document) if document is not None else None
+
+
+# projection maintained by the process persisting the events
+projection = CampaignProjection()
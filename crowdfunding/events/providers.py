@@ -0,0 +1,316 @@
+from collections import OrderedDict
+from requests.adapters import HTTPAdapter
+from web3.providers.base import JSONBaseProvider
+import itertools
+import json
+import requests
+import threading
+import time
+
+'''
+Module spreading the JSON-RPC requests over several ethereum nodes
+
+Endpoints are ranked by latency and error rate, each one is rate limited by a token
+bucket and responses that can never change are cached. It only imports third party
+packages so the standalone scripts can use it too.
+'''
+
+# JSON-RPC error codes nodes return when a client exceeds its rate limit, -32005 is
+# also used for log queries returning too many results so the message is checked too
+RATE_LIMIT_CODES = {-32005, 429}
+
+# methods whose result depends on the block number given in the last parameter
+STATE_METHODS = {'eth_call', 'eth_getCode', 'eth_getBalance', 'eth_getStorageAt', 'eth_getTransactionCount'}
+
+# methods returning an object mined in the block given by its blockNumber field
+MINED_METHODS = {'eth_getTransactionReceipt', 'eth_getTransactionByHash', 'eth_getBlockByHash'}
+
+
+class ProviderUnavailable(Exception):
+    '''
+    Raised when no endpoint could answer a request
+    '''
+
+
+def parse_block(tag):
+    # block number of a hex string or of the earliest tag, None for tags still moving
+    if tag == 'earliest':
+        return 0
+    if isinstance(tag, str) and tag.startswith('0x'):
+        return int(tag, 16)
+    if isinstance(tag, int):
+        return tag
+    return None
+
+
+def is_rate_limited(body):
+    bodies = body if isinstance(body, list) else [body]
+    for item in bodies:
+        error = item.get('error') if isinstance(item, dict) else None
+        if isinstance(error, dict) and error.get('code') in RATE_LIMIT_CODES and 'rate' in str(error.get('message')).lower():
+            return True
+    return False
+
+
+def retry_after(headers):
+    try:
+        return float(headers.get('Retry-After'))
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    '''
+    Token bucket refilled at `rate` tokens per second and holding at most `capacity`
+
+    reserve() takes a token, possibly in advance, and returns the time to wait before
+    using it, so threads and coroutines can both wait their turn.
+    '''
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self):
+        with self.lock:
+            self.refill(time.monotonic())
+            return max(0, (1 - self.tokens) / self.rate)
+
+    def reserve(self):
+        with self.lock:
+            self.refill(time.monotonic())
+            self.tokens -= 1
+            return max(0, -self.tokens / self.rate)
+
+
+class Endpoint:
+    '''
+    Node url with its moving average latency and error rate
+
+    Failing endpoints are skipped for a backoff growing with consecutive failures,
+    or for the time the node asked with a Retry-After header.
+    '''
+
+    def __init__(self, url, rate, burst, alpha=0.2, maxBackoff=60):
+        self.url = url
+        self.bucket = TokenBucket(rate, burst)
+        self.alpha = alpha
+        self.maxBackoff = maxBackoff
+        self.latency = None
+        self.errorRate = 0
+        self.failures = 0
+        self.retryAt = 0
+        self.lock = threading.Lock()
+
+    @property
+    def available(self):
+        return time.monotonic() >= self.retryAt
+
+    def score(self):
+        # expected seconds to get an answer, unmeasured endpoints are tried first
+        latency = self.latency or 0
+        return latency * (1 + 10 * self.errorRate) + self.errorRate + self.bucket.wait_time()
+
+    def record_success(self, latency):
+        with self.lock:
+            self.latency = latency if self.latency is None else (1 - self.alpha) * self.latency + self.alpha * latency
+            self.errorRate *= 1 - self.alpha
+            self.failures = 0
+
+    def record_failure(self, delay=None):
+        with self.lock:
+            self.errorRate = (1 - self.alpha) * self.errorRate + self.alpha
+            self.failures += 1
+            if delay is None:
+                delay = min(2 ** (self.failures - 1), self.maxBackoff)
+            self.retryAt = time.monotonic() + delay
+
+
+class ResponseCache:
+    '''
+    LRU of JSON-RPC results keyed by method and parameters, bounded by the number of
+    entries and by the size of their serialized results
+
+    A result taking more than `maxEntryBytes`, like the logs of a whole backfill chunk,
+    is read once and not kept, so it can not push out the many small ones.
+    '''
+
+    def __init__(self, size, maxBytes=64 * 2 ** 20, maxEntryBytes=2 ** 20):
+        self.size = size
+        self.maxBytes = maxBytes
+        self.maxEntryBytes = maxEntryBytes
+        self.entries = OrderedDict()
+        self.bytes = 0
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def key(method, params):
+        return method, json.dumps(params, sort_keys=True)
+
+    def get(self, key):
+        with self.lock:
+            if key not in self.entries:
+                return None
+            self.entries.move_to_end(key)
+            return self.entries[key][0]
+
+    def put(self, key, result):
+        size = len(json.dumps(result))
+        if size > self.maxEntryBytes:
+            return
+        with self.lock:
+            if key in self.entries:
+                self.bytes -= self.entries[key][1]
+            self.entries[key] = result, size
+            self.entries.move_to_end(key)
+            self.bytes += size
+            while len(self.entries) > self.size or self.bytes > self.maxBytes:
+                _, (_, evicted) = self.entries.popitem(last=False)
+                self.bytes -= evicted
+
+
+class ProviderPool:
+    '''
+    Endpoints shared by the sync and async clients, with the head seen by all of them
+
+    Results are cached once they are `confirmations` blocks deep: blocks by number,
+    mined transactions and receipts, logs of closed ranges and state reads at a block.
+    '''
+
+    def __init__(self, urls, confirmations=12, rate=10, burst=20, cacheSize=10000, cacheBytes=64 * 2 ** 20,
+                 timeout=10):
+        self.endpoints = [Endpoint(url, rate, burst) for url in urls]
+        self.confirmations = confirmations
+        self.cache = ResponseCache(cacheSize, cacheBytes)
+        self.timeout = timeout
+        self.head = None
+        self.ids = itertools.count()
+
+    def ranked(self):
+        # every endpoint once, available ones by score then the others by end of backoff
+        available = sorted((endpoint for endpoint in self.endpoints if endpoint.available), key=Endpoint.score)
+        waiting = sorted((endpoint for endpoint in self.endpoints if not endpoint.available), key=lambda e: e.retryAt)
+        return available + waiting
+
+    def payload(self, calls):
+        return [
+            {'jsonrpc': '2.0', 'id': next(self.ids), 'method': method, 'params': params} for method, params in calls
+        ]
+
+    def is_final(self, method, params, result):
+        if method == 'eth_chainId':
+            return result is not None
+        if result is None or self.head is None:
+            return False
+
+        if method == 'eth_getBlockByNumber':
+            block = parse_block(params[0])
+        elif method in STATE_METHODS:
+            block = parse_block(params[-1]) if len(params) > 1 else None
+        elif method in MINED_METHODS:
+            block = parse_block(result.get('blockNumber'))
+        elif method == 'eth_getLogs':
+            logFilter = params[0]
+            fromBlock = parse_block(logFilter.get('fromBlock', 'latest'))
+            block = parse_block(logFilter.get('toBlock', 'latest')) if fromBlock is not None else None
+        else:
+            return False
+        return block is not None and block <= self.head - self.confirmations
+
+    def lookup(self, calls):
+        # cached responses by position in `calls` and the payload of the calls still to send
+        cached = {}
+        missing = []
+        for index, (method, params) in enumerate(calls):
+            result = self.cache.get(ResponseCache.key(method, params))
+            if result is None:
+                missing.append(index)
+            else:
+                cached[index] = {'result': result}
+        return cached, missing, self.payload([calls[index] for index in missing])
+
+    def remember(self, method, params, body):
+        result = body.get('result')
+        if method == 'eth_blockNumber' and result is not None:
+            self.head = max(self.head or 0, int(result, 16))
+        elif 'error' not in body and self.is_final(method, params, result):
+            self.cache.put(ResponseCache.key(method, params), result)
+
+    def merge(self, cached, missing, payload, bodies):
+        # bodies of all the calls in order, once the missing ones were answered
+        if isinstance(bodies, dict):
+            # the whole batch was rejected with a single error
+            bodies = [{**bodies, 'id': request['id']} for request in payload]
+        bodies = {body['id']: body for body in bodies}
+        for index, request in zip(missing, payload):
+            body = bodies[request['id']]
+            self.remember(request['method'], request['params'], body)
+            cached[index] = body
+        return [cached[index] for index in range(len(cached))]
+
+
+class PooledProvider(JSONBaseProvider):
+    '''
+    Web3 provider sending the requests through a ProviderPool with one keep-alive
+    session per endpoint
+    '''
+
+    def __init__(self, pool, poolSize=10):
+        super().__init__()
+        self.pool = pool
+        self.sessions = {}
+        for endpoint in pool.endpoints:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=poolSize)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            self.sessions[endpoint.url] = session
+
+    def send(self, payload):
+        error = None
+        for endpoint in self.pool.ranked():
+            time.sleep(endpoint.bucket.reserve())
+            start = time.perf_counter()
+            try:
+                response = self.sessions[endpoint.url].post(endpoint.url, json=payload, timeout=self.pool.timeout)
+                if response.status_code == 429 or response.status_code >= 500:
+                    endpoint.record_failure(retry_after(response.headers))
+                    error = ProviderUnavailable(f'{endpoint.url} answered {response.status_code}')
+                    continue
+                response.raise_for_status()
+                body = response.json()
+            except (requests.RequestException, ValueError) as exception:
+                endpoint.record_failure()
+                error = exception
+                continue
+
+            if is_rate_limited(body):
+                endpoint.record_failure()
+                error = ProviderUnavailable(f'{endpoint.url} is rate limiting')
+                continue
+            endpoint.record_success(time.perf_counter() - start)
+            return body
+        raise ProviderUnavailable('No endpoint answered') from error
+
+    def batch(self, calls):
+        # response bodies of a list of (method, params), sent in one request
+        cached, missing, payload = self.pool.lookup(calls)
+        bodies = self.send(payload) if payload else []
+        return self.pool.merge(cached, missing, payload, bodies)
+
+    def make_request(self, method, params):
+        body = self.batch([(method, params)])[0]
+        return {'jsonrpc': '2.0', 'id': 0, **body}
+
+    def isConnected(self):
+        try:
+            return 'result' in self.make_request('web3_clientVersion', [])
+        except ProviderUnavailable:
+            return False
@@ -0,0 +1,111 @@
+from eth_abi import decode_abi, encode_abi
+from hexbytes import HexBytes
+from web3 import Web3
+from .metrics import RPC_LATENCY
+from .registry import get_functions
+from .rpc import RpcError, batch_method
+from collections import OrderedDict
+import threading
+
+'''
+Module reading the contract view functions through JSON-RPC batch requests
+'''
+
+# view functions whose result never changes once the contract is deployed
+IMMUTABLE_FUNCTIONS = {'minPeriodOfDeadline', 'name', 'symbol', 'decimals'}
+
+# number of block timestamps kept in memory
+TIMESTAMPS_CACHE_SIZE = 10000
+
+
+class ContractReader:
+    '''
+    Sends many eth_call requests in a single JSON-RPC batch and caches their results
+
+    Results are cached per block and the cache is emptied as soon as a newer block is
+    read, while immutable values are kept for the life of the process.
+    '''
+
+    def __init__(self, contractName, address, provider, batchSize=100):
+        self.functions = get_functions(contractName)
+        self.address = address
+        self.provider = provider
+        self.batchSize = batchSize
+        self.lock = threading.Lock()
+        self.cache = {}
+        self.cacheBlock = None
+        self.immutable = {}
+        self.timestamps = OrderedDict()
+
+    def batch(self, calls):
+        # `calls` is a list of (method, params), results are returned in the same order
+        with RPC_LATENCY.time(method=batch_method(calls)):
+            responses = self.provider.batch(calls)
+
+        results = []
+        for response in responses:
+            if 'error' in response:
+                raise RpcError(response['error'])
+            results.append(response['result'])
+        return results
+
+    def block_number(self):
+        return int(self.batch([('eth_blockNumber', [])])[0], 16)
+
+    def encode(self, fnName, args):
+        selector, inputTypes, _ = self.functions[fnName]
+        return Web3.toHex(selector + encode_abi(inputTypes, list(args)))
+
+    def decode(self, fnName, result):
+        values = decode_abi(self.functions[fnName][2], HexBytes(result))
+        return values[0] if len(values) == 1 else values
+
+    def call_many(self, calls, block=None):
+        # `calls` is a list of (function name, args), `block` defaults to the chain head
+        with self.lock:
+            if block is None:
+                block = self.block_number()
+            if block != self.cacheBlock:
+                self.cache.clear()
+                self.cacheBlock = block
+
+            keys = [(fnName, self.encode(fnName, args)) for fnName, args in calls]
+            missing = list(dict.fromkeys(
+                key for key in keys if key not in self.immutable and key not in self.cache
+            ))
+
+            for start in range(0, len(missing), self.batchSize):
+                chunk = missing[start:start + self.batchSize]
+                results = self.batch([
+                    ('eth_call', [{'to': self.address, 'data': data}, hex(block)]) for _, data in chunk
+                ])
+                for key, result in zip(chunk, results):
+                    cache = self.immutable if key[0] in IMMUTABLE_FUNCTIONS else self.cache
+                    cache[key] = self.decode(key[0], result)
+
+            return [self.immutable[key] if key in self.immutable else self.cache[key] for key in keys]
+
+    def call(self, fnName, *args, block=None):
+        return self.call_many([(fnName, args)], block)[0]
+
+    def campaigns(self, campaignIDs, block=None):
+        results = self.call_many([('campaigns', (campaignID,)) for campaignID in campaignIDs], block)
+        return dict(zip(campaignIDs, results))
+
+    def block_timestamps(self, blockNumbers):
+        # timestamps of the given blocks, read in a single batch
+        with self.lock:
+            missing = [blockNumber for blockNumber in set(blockNumbers) if blockNumber not in self.timestamps]
+            for start in range(0, len(missing), self.batchSize):
+                chunk = missing[start:start + self.batchSize]
+                blocks = self.batch([('eth_getBlockByNumber', [hex(blockNumber), False]) for blockNumber in chunk])
+                for blockNumber, block in zip(chunk, blocks):
+                    self.timestamps[blockNumber] = int(block['timestamp'], 16)
+
+            result = {}
+            for blockNumber in blockNumbers:
+                self.timestamps.move_to_end(blockNumber)
+                result[blockNumber] = self.timestamps[blockNumber]
+            while len(self.timestamps) > TIMESTAMPS_CACHE_SIZE:
+                self.timestamps.popitem(last=False)
+            return result
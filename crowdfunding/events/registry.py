@@ -0,0 +1,70 @@
+from eth_utils import event_abi_to_log_topic, function_abi_to_4byte_selector
+from functools import lru_cache
+from pathlib import Path
+import hashlib
+import json
+
+'''
+Module loading the contracts ABI and bytecode from the truffle build artifacts on first use
+
+It only depends on the standard library and eth_utils, so it can also be imported by the
+scripts of this folder.
+'''
+
+# folder holding the artifacts compiled by truffle
+BUILD_DIR = Path(__file__).resolve().parent.parent.parent / 'truffle_crowdfunding_project' / 'build' / 'contracts'
+
+
+@lru_cache(maxsize=None)
+def load_artifact(name):
+    if not name.isidentifier():
+        raise FileNotFoundError(f'Invalid contract name {name}')
+    with open(BUILD_DIR / f'{name}.json') as artifact:
+        content = json.load(artifact)
+    # keep only what is used, the full artifact also holds the sources and their AST
+    return {'abi': content['abi'], 'bytecode': content['bytecode'], 'networks': content.get('networks', {})}
+
+
+def get_abi(name):
+    return load_artifact(name)['abi']
+
+
+def get_bytecode(name):
+    return load_artifact(name)['bytecode']
+
+
+@lru_cache(maxsize=None)
+def get_abi_json(name):
+    # serialized abi and its etag, served to the frontend
+    body = json.dumps(get_abi(name), separators=(',', ':')).encode()
+    return body, hashlib.sha1(body).hexdigest()
+
+
+@lru_cache(maxsize=None)
+def get_event_topics(name):
+    # topic0 -> event name
+    return {
+        '0x' + event_abi_to_log_topic(abi).hex(): abi['name']
+        for abi in get_abi(name) if abi['type'] == 'event'
+    }
+
+
+@lru_cache(maxsize=None)
+def get_functions(name):
+    # function name -> (selector, input types, output types)
+    return {
+        abi['name']: (
+            function_abi_to_4byte_selector(abi),
+            [argument['type'] for argument in abi['inputs']],
+            [output['type'] for output in abi['outputs']],
+        )
+        for abi in get_abi(name) if abi['type'] == 'function'
+    }
+
+
+@lru_cache(maxsize=None)
+def get_contract(web3, name, address=None):
+    # contract objects are built once per web3 instance
+    if address is None:
+        return web3.eth.contract(abi=get_abi(name), bytecode=get_bytecode(name))
+    return web3.eth.contract(address=address, abi=get_abi(name))
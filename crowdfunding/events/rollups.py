@@ -0,0 +1,126 @@
+from bson.decimal128 import Decimal128
+from collections import defaultdict
+from datetime import datetime, timezone
+from pymongo import ASCENDING, UpdateOne
+from .contract import get_reader
+from .mongo import get_database
+
+'''
+Module maintaining per minute, hour and day aggregates of the contract events
+'''
+
+# collection holding one document per (event, campaign, granularity, bucket)
+ROLLUPS_COLLECTION = 'event_rollups'
+
+# bucket sizes in seconds
+GRANULARITIES = {'minute': 60, 'hour': 60 * 60, 'day': 24 * 60 * 60}
+
+# argument holding the wei amount and the funder of each event
+AMOUNT_ARGS = {'NewContribution': 'amountFunded', 'Refund': 'amount', 'OfferReceived': 'amount', 'Transfer': 'value'}
+FUNDER_ARGS = {'NewContribution': 'from', 'Refund': 'refunded'}
+
+# maximum number of buckets returned by a query
+MAX_BUCKETS = 10000
+
+indexesReady = False
+
+
+def get_collection():
+    global indexesReady
+    collection = get_database()[ROLLUPS_COLLECTION]
+    if not indexesReady:
+        collection.create_index([
+            ('event', ASCENDING), ('campaignID', ASCENDING), ('granularity', ASCENDING), ('bucket', ASCENDING),
+        ], unique=True)
+        collection.create_index([('event', ASCENDING), ('granularity', ASCENDING), ('bucket', ASCENDING)])
+        indexesReady = True
+    return collection
+
+
+def bucket_start(timestamp, size):
+    return datetime.fromtimestamp(timestamp - timestamp % size, tz=timezone.utc)
+
+
+def event_timestamps(events):
+    # timestamps of the blocks of the events, read from the node
+    if not events:
+        return {}
+    return get_reader().block_timestamps([event['blockNumber'] for event in events])
+
+
+def apply_rollups(events, timestamps):
+    # aggregate the batch in memory, then one upsert per touched bucket
+    if not events:
+        return
+
+    totals = defaultdict(lambda: {'count': 0, 'wei': 0, 'funders': set()})
+    for event in events:
+        eventName = event['event']
+        args = event['args']
+        timestamp = timestamps[event['blockNumber']]
+        for granularity, size in GRANULARITIES.items():
+            total = totals[(eventName, args.get('campaignID'), granularity, bucket_start(timestamp, size))]
+            total['count'] += 1
+            total['wei'] += int(args.get(AMOUNT_ARGS.get(eventName), 0) or 0)
+            if eventName in FUNDER_ARGS:
+                total['funders'].add(args[FUNDER_ARGS[eventName]])
+
+    operations = []
+    for (eventName, campaignID, granularity, bucket), total in totals.items():
+        # decimal128 keeps wei sums exact well beyond the 64 bit integers range
+        update = {'$inc': {'count': total['count'], 'wei': Decimal128(str(total['wei']))}}
+        if total['funders']:
+            update['$addToSet'] = {'funders': {'$each': sorted(total['funders'])}}
+        operations.append(UpdateOne(
+            {'event': eventName, 'campaignID': campaignID, 'granularity': granularity, 'bucket': bucket},
+            update, upsert=True,
+        ))
+    get_collection().bulk_write(operations, ordered=False)
+
+
+def query_rollups(eventName, granularity, start, end, campaignID=None):
+    # buckets between the `start` and `end` unix timestamps, summed over all the campaigns when none is given
+    if granularity not in GRANULARITIES:
+        raise ValueError(f'Unknown granularity {granularity}')
+    if end < start:
+        raise ValueError('The end of the range precedes its start')
+    if (end - start) // GRANULARITIES[granularity] > MAX_BUCKETS:
+        raise ValueError(f'Too many buckets, at most {MAX_BUCKETS} can be returned')
+
+    match = {
+        'event': eventName,
+        'granularity': granularity,
+        'bucket': {
+            '$gte': bucket_start(start, GRANULARITIES[granularity]),
+            '$lte': bucket_start(end, GRANULARITIES[granularity]),
+        },
+    }
+    if campaignID is not None:
+        match['campaignID'] = campaignID
+
+    pipeline = [
+        {'$match': match},
+        {'$group': {
+            '_id': '$bucket',
+            'count': {'$sum': '$count'},
+            'wei': {'$sum': '$wei'},
+            'funders': {'$push': {'$ifNull': ['$funders', []]}},
+        }},
+        {'$project': {
+            'count': 1,
+            'wei': 1,
+            'funders': {'$size': {'$reduce': {
+                'input': '$funders', 'initialValue': [], 'in': {'$setUnion': ['$$value', '$$this']},
+            }}},
+        }},
+        {'$sort': {'_id': ASCENDING}},
+    ]
+    return [
+        {
+            'bucket': int(document['_id'].replace(tzinfo=timezone.utc).timestamp()),
+            'count': document['count'],
+            'wei': str(document['wei'].to_decimal()),
+            'funders': document['funders'],
+        }
+        for document in get_collection().aggregate(pipeline)
+    ]
@@ -0,0 +1,107 @@
+from .metrics import RPC_LATENCY
+from .providers import ProviderUnavailable, is_rate_limited, retry_after
+import aiohttp
+import asyncio
+import time
+
+'''
+Module providing an asyncio JSON-RPC client for the ethereum nodes
+'''
+
+
+def batch_method(calls):
+    # batches are timed under their method when they all share it
+    methods = {method for method, _ in calls}
+    return methods.pop() if len(methods) == 1 else 'batch'
+
+
+class RpcError(Exception):
+    '''
+    Error returned by the node for a JSON-RPC request
+    '''
+
+    def __init__(self, error):
+        super().__init__(error.get('message', error))
+        self.code = error.get('code')
+
+
+class AsyncRpcClient:
+    '''
+    Asyncio JSON-RPC client sending the requests through a ProviderPool, over a single
+    session keeping alive connections to all its endpoints
+    '''
+
+    def __init__(self, pool, poolSize=20):
+        self.pool = pool
+        self.poolSize = poolSize
+        self.timeout = aiohttp.ClientTimeout(total=pool.timeout)
+        self.session = None
+
+    async def get_session(self):
+        # the session has to be created inside the running event loop
+        if self.session is None or self.session.closed:
+            connector = aiohttp.TCPConnector(limit_per_host=self.poolSize)
+            self.session = aiohttp.ClientSession(connector=connector, timeout=self.timeout)
+        return self.session
+
+    async def send(self, payload):
+        # try the endpoints from the healthiest one until one answers
+        session = await self.get_session()
+        error = None
+        for endpoint in self.pool.ranked():
+            await asyncio.sleep(endpoint.bucket.reserve())
+            start = time.perf_counter()
+            try:
+                async with session.post(endpoint.url, json=payload) as response:
+                    if response.status == 429 or response.status >= 500:
+                        endpoint.record_failure(retry_after(response.headers))
+                        error = ProviderUnavailable(f'{endpoint.url} answered {response.status}')
+                        continue
+                    response.raise_for_status()
+                    body = await response.json(content_type=None)
+            except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as exception:
+                endpoint.record_failure()
+                error = exception
+                continue
+
+            if is_rate_limited(body):
+                endpoint.record_failure()
+                error = ProviderUnavailable(f'{endpoint.url} is rate limiting')
+                continue
+            endpoint.record_success(time.perf_counter() - start)
+            return body
+        raise ProviderUnavailable('No endpoint answered') from error
+
+    async def responses(self, calls):
+        cached, missing, payload = self.pool.lookup(calls)
+        bodies = []
+        if payload:
+            with RPC_LATENCY.time(method=batch_method([calls[index] for index in missing])):
+                bodies = await self.send(payload)
+        return self.pool.merge(cached, missing, payload, bodies)
+
+    async def request(self, method, params=None):
+        body = (await self.responses([(method, params or [])]))[0]
+        if 'error' in body:
+            raise RpcError(body['error'])
+        return body['result']
+
+    async def batch(self, calls, raiseErrors=True):
+        # `calls` is a list of (method, params) sent in one request, results keep the same order
+        # and, with `raiseErrors` false, failed calls are returned as RpcError instances
+        if not calls:
+            return []
+        results = []
+        for body in await self.responses(calls):
+            if 'error' in body:
+                if raiseErrors:
+                    raise RpcError(body['error'])
+                results.append(RpcError(body['error']))
+            else:
+                results.append(body['result'])
+        return results
+
+    async def close(self):
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
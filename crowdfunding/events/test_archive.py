@@ -0,0 +1,54 @@
+from django.test import SimpleTestCase
+from .archive import EventArchive, GWEI
+import tempfile
+
+'''
+Round trip of events through the columnar archive, run with "python manage.py test events.test_archive"
+'''
+
+BENEFICIARY = '0x' + '11' * 20
+FUNDER = '0x' + '22' * 20
+
+
+def make_event(eventName, blockNumber, logIndex, transactionHash, **args):
+    return {
+        'event': eventName,
+        'args': args,
+        'blockNumber': blockNumber,
+        'logIndex': logIndex,
+        'transactionHash': transactionHash,
+    }
+
+
+class EventArchiveTest(SimpleTestCase):
+
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+        self.archive = EventArchive(self.folder.name)
+
+    def tearDown(self):
+        self.folder.cleanup()
+
+    def test_round_trip(self):
+        events = [
+            make_event('NewCampaignCreated', 10, 0, '0x' + 'ab' * 31 + '00',
+                       campaignID=0, beneficiary=BENEFICIARY, amount=0, deadline=1700000000),
+            make_event('NewContribution', 12, 3, '0x' + '00' * 32,
+                       campaignID=0, **{'from': FUNDER}, amountFunded=3 * GWEI + 7),
+            make_event('Refund', 15, 1, '0x00' + 'cd' * 29 + '0000',
+                       campaignID=0, refunded=FUNDER, amount=3 * GWEI + 7),
+            make_event('GoalReached', 100001, 0, '0x' + '0f' * 32, campaignID=1, timestamp=1700000001),
+        ]
+
+        self.assertEqual(self.archive.append(events, 100005, {0: 'first campaign'}), len(events))
+        self.assertEqual(self.archive.archivedBlock, 100005)
+        self.assertEqual(list(self.archive.iter_events()), events)
+        self.assertEqual(len(self.archive.segments()), 2)
+        self.assertEqual(self.archive.side_table(self.archive.segments()[0])['descriptions'], {'0': 'first campaign'})
+
+    def test_range(self):
+        events = [make_event('GoalReached', block, 0, '0x' + f'{block:064x}', campaignID=block, timestamp=block)
+                  for block in range(1, 6)]
+        self.archive.append(events, 5)
+        self.assertEqual(list(self.archive.iter_events(2, 4)), events[1:4])
+        self.assertEqual(self.archive.positions(2, 4), {(2, 0), (3, 0), (4, 0)})
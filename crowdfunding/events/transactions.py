@@ -0,0 +1,233 @@
+from eth_abi import encode_abi
+from web3 import Web3
+from .registry import get_functions
+from .rpc import RpcError
+import asyncio
+import logging
+import time
+
+'''
+Module signing and submitting many contract transactions concurrently
+'''
+
+logger = logging.getLogger(__name__)
+
+# errors of nodes receiving a transaction they already have in their pool
+KNOWN_ERRORS = ('already known', 'known transaction', 'already imported')
+
+# gas of the calls that can not be estimated yet, like contributions to a campaign created in the same run
+DEFAULT_GAS = {'newCampaign': 500000, 'contribute': 200000, 'refund': 100000, 'checkGoalReached': 100000}
+
+
+class NonceManager:
+    '''
+    Hands out consecutive nonces per account, reading the pending count from the node only once
+    '''
+
+    def __init__(self, rpc):
+        self.rpc = rpc
+        self.nonces = {}
+        self.lock = asyncio.Lock()
+
+    async def next(self, address):
+        async with self.lock:
+            if address not in self.nonces:
+                self.nonces[address] = int(await self.rpc.request('eth_getTransactionCount', [address, 'pending']), 16)
+            nonce = self.nonces[address]
+            self.nonces[address] += 1
+            return nonce
+
+    async def reset(self, address):
+        # the next nonce is read again from the pending count of the node
+        async with self.lock:
+            self.nonces.pop(address, None)
+
+
+class TransactionPipeline:
+    '''
+    Builds, signs and sends batches of contract calls, then waits for all their receipts
+
+    Every batch is signed off the event loop and sent as a single JSON-RPC batch, while
+    a separate task polls the receipts of the transactions in flight. Gas is estimated
+    once per method and calldata length and reused, with a safety margin, for every
+    later call of the same size. When the estimate reverts, as for a contribution to a
+    campaign created earlier in the same run, the method uses its DEFAULT_GAS and a
+    call that really reverts fails on chain.
+
+    When the node rejects a transaction, the transactions of the same account it
+    accepted with later nonces are unblocked by an empty transfer taking the nonce
+    left unused, and the next nonce of the account is read again from the node.
+    '''
+
+    def __init__(self, rpc, contractName, address, gasPrice=None, batchSize=100, maxPending=500,
+                 gasMargin=1.5, receiptInterval=1, timeout=10 * 60, sendRetries=3):
+        self.rpc = rpc
+        self.functions = get_functions(contractName)
+        self.address = address
+        self.gasPrice = gasPrice
+        self.batchSize = batchSize
+        self.maxPending = maxPending
+        self.gasMargin = gasMargin
+        self.receiptInterval = receiptInterval
+        self.timeout = timeout
+        self.sendRetries = sendRetries
+
+        self.nonces = NonceManager(rpc)
+        self.gasEstimates = {}
+        self.chainId = None
+        self.pending = {}
+        self.results = {}
+
+    def encode(self, fnName, args):
+        selector, inputTypes, _ = self.functions[fnName]
+        return Web3.toHex(selector + encode_abi(inputTypes, list(args)))
+
+    async def prepare(self):
+        self.chainId = int(await self.rpc.request('eth_chainId'), 16)
+        if self.gasPrice is None:
+            self.gasPrice = int(await self.rpc.request('eth_gasPrice'), 16)
+
+    async def estimate_gas(self, fnName, sender, data, value):
+        # calls storing longer strings, like newCampaign descriptions, take more gas
+        key = (fnName, len(data))
+        if key not in self.gasEstimates:
+            try:
+                estimate = int(await self.rpc.request('eth_estimateGas', [{
+                    'from': sender, 'to': self.address, 'data': data, 'value': hex(value),
+                }]), 16)
+            except RpcError as error:
+                if fnName not in DEFAULT_GAS:
+                    raise
+                logger.warning('Estimating %s failed, using %d gas: %s', fnName, DEFAULT_GAS[fnName], error)
+                self.gasEstimates[key] = DEFAULT_GAS[fnName]
+            else:
+                self.gasEstimates[key] = int(estimate * self.gasMargin)
+        return self.gasEstimates[key]
+
+    async def build(self, call):
+        # `call` is a dict with the function name, its args, the sending account and the value
+        account = call['account']
+        data = self.encode(call['method'], call['args'])
+        value = call.get('value', 0)
+        return {
+            'chainId': self.chainId,
+            'to': self.address,
+            'data': data,
+            'value': value,
+            'gas': await self.estimate_gas(call['method'], account.address, data, value),
+            'gasPrice': self.gasPrice,
+            'nonce': await self.nonces.next(account.address),
+        }
+
+    def sign(self, transactions):
+        # hash and raw bytes of every transaction
+        signed = [account.sign_transaction(transaction) for account, transaction in transactions]
+        return [(Web3.toHex(transaction.hash), Web3.toHex(transaction.rawTransaction)) for transaction in signed]
+
+    async def send_raw(self, rawTransactions):
+        # signed transactions are sent again as they are, a node already holding them says so
+        for _ in range(self.sendRetries):
+            try:
+                return await self.rpc.batch(
+                    [('eth_sendRawTransaction', [rawTransaction]) for rawTransaction in rawTransactions],
+                    raiseErrors=False,
+                )
+            except Exception as exception:
+                logger.warning('Sending %d transactions failed: %s', len(rawTransactions), exception)
+                error = exception
+                await asyncio.sleep(self.receiptInterval)
+        return [RpcError({'message': str(error)})] * len(rawTransactions)
+
+    async def fill_gaps(self, account, nonces):
+        # empty transfers to the account itself, so the transactions queued after these nonces get mined
+        transactions = [(account, {
+            'chainId': self.chainId, 'to': account.address, 'value': 0, 'gas': 21000,
+            'gasPrice': self.gasPrice, 'nonce': nonce,
+        }) for nonce in nonces]
+        loop = asyncio.get_running_loop()
+        signed = await loop.run_in_executor(None, self.sign, transactions)
+        results = await self.send_raw([rawTransaction for _, rawTransaction in signed])
+        for nonce, result in zip(nonces, results):
+            if isinstance(result, RpcError):
+                logger.error('Filling nonce %d of %s failed: %s', nonce, account.address, result)
+
+    async def send_batch(self, batch):
+        # batch is a list of (index, call)
+        built = []
+        for index, call in batch:
+            try:
+                built.append((index, call['account'], await self.build(call)))
+            except RpcError as error:
+                # the estimate fails for calls without a default gas, no nonce is used for them
+                self.results[index] = {'error': str(error)}
+
+        loop = asyncio.get_running_loop()
+        signed = await loop.run_in_executor(
+            None, self.sign, [(account, transaction) for _, account, transaction in built]
+        )
+        results = await self.send_raw([rawTransaction for _, rawTransaction in signed])
+
+        # nonces of the rejected transactions and last nonce accepted, by account
+        rejected = {}
+        accepted = {}
+        for (index, account, transaction), (txHash, _), result in zip(built, signed, results):
+            if isinstance(result, RpcError) and not any(known in str(result).lower() for known in KNOWN_ERRORS):
+                self.results[index] = {'error': str(result)}
+                rejected.setdefault(account.address, (account, []))[1].append(transaction['nonce'])
+            else:
+                self.pending[txHash] = (index, time.monotonic() + self.timeout)
+                accepted[account.address] = max(accepted.get(account.address, -1), transaction['nonce'])
+
+        for address, (account, nonces) in rejected.items():
+            gaps = [nonce for nonce in nonces if nonce < accepted.get(address, -1)]
+            if gaps:
+                await self.fill_gaps(account, gaps)
+            await self.nonces.reset(address)
+
+    async def poll_receipts(self, done):
+        # every transaction gets `timeout` seconds from the time it was sent
+        while self.pending or not done.is_set():
+            now = time.monotonic()
+            for txHash, (index, deadline) in list(self.pending.items()):
+                if now > deadline:
+                    self.results[index] = {'transactionHash': txHash, 'error': 'timeout'}
+                    del self.pending[txHash]
+
+            hashes = list(self.pending)[:self.batchSize]
+            try:
+                receipts = await self.rpc.batch([('eth_getTransactionReceipt', [txHash]) for txHash in hashes])
+            except Exception:
+                logger.exception('Reading receipts failed')
+                receipts = []
+            for txHash, receipt in zip(hashes, receipts):
+                if receipt is not None:
+                    index, _ = self.pending.pop(txHash)
+                    self.results[index] = {
+                        'transactionHash': txHash,
+                        'status': int(receipt['status'], 16),
+                        'blockNumber': int(receipt['blockNumber'], 16),
+                        'gasUsed': int(receipt['gasUsed'], 16),
+                    }
+            if len(hashes) < self.batchSize or not any(receipts):
+                await asyncio.sleep(self.receiptInterval)
+
+    async def submit(self, calls):
+        # returns one result per call, in the same order
+        await self.prepare()
+        done = asyncio.Event()
+        poller = asyncio.ensure_future(self.poll_receipts(done))
+
+        try:
+            indexed = list(enumerate(calls))
+            for start in range(0, len(indexed), self.batchSize):
+                # let the receipts catch up before adding more transactions to the pool
+                while len(self.pending) >= self.maxPending:
+                    await asyncio.sleep(self.receiptInterval)
+                await self.send_batch(indexed[start:start + self.batchSize])
+                logger.info('Sent %d/%d transactions', min(start + self.batchSize, len(indexed)), len(indexed))
+            done.set()
+            await poller
+        finally:
+            poller.cancel()
+
+        return [self.results.get(index, {'error': 'not sent'}) for index in range(len(calls))]
@@ -1,5 +1,136 @@
+from django.conf import settings
+from django.http import HttpResponse, JsonResponse
 from django.shortcuts import render
+from django.views.decorators.http import condition
+from eth_utils import is_address, to_checksum_address
+from .ledger import get_ledger, to_json as ledger_json
+from .metrics import render as render_metrics
+from .profiler import profiler
+from .projections import EXPIRING_WINDOW, find_campaigns, get_campaign
+from .registry import get_abi_json
+from .rollups import query_rollups
+import time
 
 
 def index(request):
     return render(request, 'index.html')
+
+
+def campaigns(request):
+    # list of campaigns with cursor pagination, filtered by ?status=active|expiring|completed
+    try:
+        limit = min(max(int(request.GET.get('limit', 20)), 1), 100)
+        cursor = int(request.GET['cursor']) if 'cursor' in request.GET else None
+        within = int(request.GET.get('within', EXPIRING_WINDOW))
+        results, nextCursor = find_campaigns(request.GET.get('status'), cursor, limit, within)
+    except ValueError as error:
+        return JsonResponse({'error': str(error)}, status=400)
+
+    ledger = get_ledger()
+    for result in results:
+        result['numFunders'] = ledger.funder_count(result['campaignID'])
+    return JsonResponse({'campaigns': results, 'next': nextCursor})
+
+
+def campaign(request, campaignID):
+    result = get_campaign(campaignID)
+    if result is None:
+        return JsonResponse({'error': 'Campaign not found'}, status=404)
+    result['numFunders'] = get_ledger().funder_count(campaignID)
+    return JsonResponse(result)
+
+
+def campaign_funders(request, campaignID):
+    # top funders of a campaign, ?limit=<n>
+    try:
+        limit = min(max(int(request.GET.get('limit', 10)), 1), 100)
+    except ValueError as error:
+        return JsonResponse({'error': str(error)}, status=400)
+
+    funders = get_ledger().top_funders(campaignID, limit)
+    return JsonResponse({'funders': [ledger_json(entry) for entry in funders]})
+
+
+def campaign_refunds(request, campaignID):
+    # funders who can still ask for a refund, empty until the deadline of a failed campaign
+    try:
+        limit = min(max(int(request.GET.get('limit', 100)), 1), 1000)
+    except ValueError as error:
+        return JsonResponse({'error': str(error)}, status=400)
+
+    refunds = get_ledger().refundable(campaignID, limit=limit)
+    return JsonResponse({'refunds': [ledger_json(entry) for entry in refunds]})
+
+
+def funder(request, address):
+    # contributions of an address to all the campaigns
+    if not is_address(address):
+        return JsonResponse({'error': 'Invalid address'}, status=400)
+
+    totals = get_ledger().funder_totals(to_checksum_address(address))
+    totals['campaigns'] = [ledger_json(entry) for entry in totals['campaigns']]
+    return JsonResponse(ledger_json(totals))
+
+
+def stats(request):
+    # aggregates of an event type, e.g. ?event=NewContribution&campaign=12&granularity=hour&from=<unix time>
+    try:
+        end = int(request.GET.get('to', time.time()))
+        start = int(request.GET.get('from', end - 7 * 24 * 60 * 60))
+        campaignID = int(request.GET['campaign']) if 'campaign' in request.GET else None
+        buckets = query_rollups(
+            request.GET.get('event', 'NewContribution'), request.GET.get('granularity', 'hour'), start, end, campaignID
+        )
+    except ValueError as error:
+        return JsonResponse({'error': str(error)}, status=400)
+
+    return JsonResponse({'buckets': buckets})
+
+
+def abi_etag(request, name):
+    try:
+        return get_abi_json(name)[1]
+    except FileNotFoundError:
+        return None
+
+
+@condition(etag_func=abi_etag)
+def abi(request, name):
+    # contract abi for the frontend, browsers revalidate it with If-None-Match
+    try:
+        body, _ = get_abi_json(name)
+    except FileNotFoundError:
+        return JsonResponse({'error': 'Contract not found'}, status=404)
+
+    response = HttpResponse(body, content_type='application/json')
+    response['Cache-Control'] = 'public, max-age=3600'
+    return response
+
+
+def metrics(request):
+    # metrics of this process in the prometheus text format
+    return HttpResponse(render_metrics(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+def profile(request):
+    # sampling profiler, ?action=start|stop or ?seconds=<n> for a single run, stacks are
+    # returned in the collapsed format of flamegraph tools
+    if not (settings.DEBUG or request.user.is_staff):
+        return JsonResponse({'error': 'Forbidden'}, status=403)
+
+    action = request.GET.get('action')
+    if action == 'start':
+        profiler.start()
+        return JsonResponse({'running': True})
+    if action == 'stop':
+        return HttpResponse(profiler.stop(), content_type='text/plain; charset=utf-8')
+
+    try:
+        seconds = min(max(float(request.GET.get('seconds', 10)), 0.1), 60)
+    except ValueError as error:
+        return JsonResponse({'error': str(error)}, status=400)
+    if profiler.running:
+        return JsonResponse({'error': 'Profiler already running'}, status=409)
+    profiler.start()
+    time.sleep(seconds)
+    return HttpResponse(profiler.stop(), content_type='text/plain; charset=utf-8')